@@ -1,7 +1,8 @@
-from api_client.meal_db import MealDBClient
+from api_client.meal_db import MealDBClient, create_session
 
 NAME = 'meal_db_client'
 
 __all__ = [
-    'MealDBClient'
+    'MealDBClient',
+    'create_session'
 ]
\ No newline at end of file
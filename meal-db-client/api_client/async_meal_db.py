@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import aiohttp
+
+from api_client import writers
+from api_client.meal_db import FILTER_VALUE_KEYS, RETRY_STATUS_CODES, filter_endpoint, search_endpoint
+
+"""An asyncio client to connect and get data from The Meal DB public API https://www.themealdb.com/api.php."""
+
+class AsyncMealDBClient:
+    """
+    Asyncio counterpart of MealDBClient, its methods are coroutines returning the same data.
+    Use it as an async context manager, or call close() when done, to release its connections:
+
+        async with AsyncMealDBClient(key='1', concurrency=20) as client:
+            df_meals = await client.lookup_meals(meal_ids)
+
+    Parameters
+    ----------
+        key (str): API key for authentication, for app development phase use '1'
+                   For a production API key, signup as Patreon supporter.
+
+        api_base_url (str): The Meal DB API base url, default 'https://www.themealdb.com/api/json/v1'.
+
+        concurrency (int): Maximum number of requests in flight at once, which is also the size of the connection pool, default 10.
+
+        timeout (float): Seconds to wait for each request to complete, default 10.
+
+        max_retries (int): Retries on connection errors and 429/5xx responses, default 3.
+
+        backoff_factor (float): Exponential backoff between retries: backoff_factor * 2 ** retry seconds, default 0.5.
+
+    """
+    def __init__(self, key, api_base_url='https://www.themealdb.com/api/json/v1', concurrency=10,
+                 timeout=10, max_retries=3, backoff_factor=0.5):
+        self.url_base = f'{api_base_url}/{key}'
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the client's connection pool.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        """
+        Creates the aiohttp session and its semaphore on first use, so they are bound to the running event loop.
+        """
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _get_json(self, endpoint):
+        """
+        Gets the parsed JSON of an endpoint, retrying connection errors and 429/5xx responses with exponential backoff.
+
+        Parameters
+        ----------
+            endpoint (str): The endpoint to call in the API.
+
+        Returns
+        -------
+            dict_response (dict): Parsed JSON body of the server's response.
+
+        Raises
+        ------
+            aiohttp.ClientError or asyncio.TimeoutError : If the API could not be reached after all retries.
+        """
+        url = self.url_base + endpoint
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    async with session.get(url) as response:
+                        if response.status not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                            logging.debug('Successfully connected to API.', extra={'url': url})
+                            return await response.json(content_type=None, encoding='utf-8')
+                        logging.warning(f'API responded {response.status}, retrying.', extra={'url': url})
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if attempt == self.max_retries:
+                    logging.error("Could not connect to the API. Can you verify the input parameters?", extra={'error': err})
+                    raise
+            await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+
+    async def _export_records(self, records, output_type, output_path):
+        """
+        Runs writers.export_records in the default executor, so its file and pandas work doesn't block the event loop
+        and the other requests in flight.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, writers.export_records, records, output_type, output_path)
+
+    async def gather_meals(self, endpoints):
+        """
+        Calls every endpoint concurrently, up to the client's concurrency, and gathers the returned meals into a single list.
+
+        Parameters
+        ----------
+            endpoints (iterable) : Endpoints to call in the API, eg: ['/lookup.php?i=52772', '/lookup.php?i=52773'].
+
+        Returns
+        -------
+            list_meals (list) : Meals dicts returned by all the endpoints, in the same order as the endpoints.
+        """
+        responses = await asyncio.gather(*(self._get_json(endpoint) for endpoint in endpoints))
+
+        list_meals = []
+        for response in responses:
+            list_meals.extend(response['meals'] or [])
+        return list_meals
+
+    async def list_filter_values(self, filter_type):
+        """
+        Get all the values of a filter type.
+
+        Parameters
+        ----------
+            filter_type (str) : Filter types supported by the API: category, area, ingredient.
+
+        Returns
+        -------
+            list_filter_values (list) : List with all possible values for a given filter_type.
+        """
+        if filter_type not in FILTER_VALUE_KEYS:
+            logging.error("Please insert a valid filter type: ingredient, category or area.")
+            return
+
+        dict_meals = (await self._get_json(f'/list.php?{filter_type[0]}=list'))['meals']
+        return [d[FILTER_VALUE_KEYS[filter_type]] for d in dict_meals]
+
+    async def get_meals_filter_by(self, filter_type, filter_value, n_meals=None, output_type='pandas', output_path=None):
+        """
+        Get the n first meals filtered according to filter_type = filter_value.
+        See MealDBClient.get_meals_filter_by for the parameters.
+
+        Returns
+        -------
+            df_meals : Meals basic info according to input filter criteria.
+                       columns: [idMeal, strMeal, strMealThumb]
+        """
+        endpoint = filter_endpoint(filter_type, filter_value)
+        if endpoint is None:
+            return
+
+        dict_meals = (await self._get_json(endpoint))['meals']
+        if not dict_meals:
+            logging.error(f'Could not find any meal with this filter, please retry with another value.')
+            return
+
+        if n_meals:
+            dict_meals = dict_meals[:n_meals]
+        logging.info(f'Getting data for {len(dict_meals)} meals with the selected filter.')
+
+        return await self._export_records(dict_meals, output_type, output_path)
+
+    async def get_meals_search_by(self, search_type, search_value, output_type='pandas', output_path=None):
+        """
+        Get all the meals that match a search criteria.
+        See MealDBClient.get_meals_search_by for the parameters.
+
+        Returns
+        -------
+            df_meals (pandas.DataFrame) : DataFrame containing meals recipes that match input search criteria.
+        """
+        endpoint = search_endpoint(search_type, search_value)
+        if endpoint is None:
+            return
+
+        dict_meals = (await self._get_json(endpoint))['meals']
+        if not dict_meals:
+            logging.error(f'Could not find any meal with this search, please retry with another value.')
+            return
+
+        logging.info(f'Getting data for {len(dict_meals)} meals with this search.')
+
+        return await self._export_records(dict_meals, output_type, output_path)
+
+    async def get_meals_random(self, n_meals=1, output_type='pandas', output_path=None):
+        """
+        Get n random meals recipes, requested concurrently.
+        See MealDBClient.get_meals_random for the parameters.
+
+        Returns
+        -------
+            df_meals (pandas.DataFrame) : DataFrame containing n random meals recipes.
+        """
+        list_meals = await self.gather_meals(['/random.php'] * n_meals)
+        logging.info(f'Getting data for {len(list_meals)} random meals.')
+
+        return await self._export_records(list_meals, output_type, output_path)
+
+    async def lookup_meals(self, meal_ids, output_type='pandas', output_path=None):
+        """
+        Get the recipes of a batch of meal ids, looked up concurrently.
+
+        Parameters
+        ----------
+            meal_ids (iterable) : Meal ids to look up, eg: ['52772', '52773'].
+
+            output_type (str) : Format of the data outuput: pandas (pandas.DataFrame), csv, jsonl or parquet.
+
+            output_path (str) : Absolute path of where the file should be written to, default './output.{output_type}'.
+
+        Returns
+        -------
+            df_meals (pandas.DataFrame) : DataFrame containing the recipes of the meals found, in the order of meal_ids.
+        """
+        list_meals = await self.gather_meals(search_endpoint('meal_id', meal_id) for meal_id in meal_ids)
+        logging.info(f'Getting data for {len(list_meals)} meals looked up by id.')
+
+        return await self._export_records(list_meals, output_type, output_path)
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from api_client import writers
+from api_client.meal_db import FILTER_TYPES, SEARCH_TYPES
+
+"""Batch jobs running many filter, search and random queries concurrently in one process, over a shared client."""
+
+# Client generator and accepted parameters of each job type.
+JOB_TYPES = {
+    'filter': ('iter_meals_filter_by', ['filter_type', 'filter_value', 'n_meals', 'how', 'details', 'workers']),
+    'search': ('iter_meals_search_by', ['search_type', 'search_value']),
+    'random': ('iter_meals_random', ['n_meals', 'workers', 'unique'])
+}
+
+
+def read_jobs(path):
+    """
+    Reads a list of jobs from a JSON lines or YAML file, eg:
+
+        {"name": "breakfast", "type": "filter", "filter_type": "category", "filter_value": "Breakfast"}
+        {"type": "search", "search_type": "meal_name", "search_value": "Carbonara", "output_type": "jsonl"}
+        {"type": "random", "n_meals": 50, "workers": 4}
+
+    Parameters
+    ----------
+        path (str): Path of a .jsonl, .yaml or .yml file. YAML files require pyyaml and hold a list of jobs.
+
+    Returns
+    -------
+        jobs (list) : Jobs dicts, or None if the file type is not supported.
+
+    Raises
+    ------
+        ValueError : If the YAML file does not hold a list of jobs.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    elif extension in ['.yaml', '.yml']:
+        try:
+            import yaml
+        except ImportError:
+            logging.error('Please install pyyaml to read YAML jobs, or write them as JSON lines.')
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            jobs = yaml.safe_load(f) or []
+        if not isinstance(jobs, list):
+            raise ValueError(f'{path} should hold a list of jobs, not a {type(jobs).__name__}.')
+        return jobs
+    else:
+        logging.error('Please insert a jsonl or yaml file of jobs.')
+        return
+
+
+def _job_name(job, index):
+    return str(job.get('name', f'job_{index}'))
+
+
+def _validate_types(job_type, job):
+    """
+    Raises a ValueError when the filter or search types of a job are not accepted by the client,
+    which would otherwise log an error and return no meal, hiding the bad job as empty.
+    """
+    if job_type == 'filter':
+        filter_types = job.get('filter_type')
+        filter_types = [filter_types] if isinstance(filter_types, str) else list(filter_types or [None])
+        invalid = [filter_type for filter_type in filter_types if filter_type not in FILTER_TYPES]
+        if invalid:
+            raise ValueError(f'Invalid filter type {invalid}, please use ingredient, category or area.')
+    elif job_type == 'search' and job.get('search_type') not in SEARCH_TYPES:
+        raise ValueError(f"Invalid search type {job.get('search_type')}, please use meal_name or meal_id.")
+
+
+def run_job(client, job, output_dir, index=0):
+    """
+    Runs a job and writes its meals to a file as they are pulled.
+
+    Parameters
+    ----------
+        client (MealDBClient): Client running the job.
+
+        job (dict): Job type, its client parameters, and optionally name, output_type (default csv) and output_path.
+
+        output_dir (str): Directory of the output file when the job has no output_path.
+
+        index (int): Position of the job in the batch, naming it when it has no name, default 0.
+
+    Returns
+    -------
+        result (dict) : Name, type, status (ok, empty or failed), output path, number of meals, seconds and error of the job.
+    """
+    job = dict(job)
+    job_type = job.pop('type', None)
+    name = _job_name(job, index)
+    job.pop('name', None)
+    output_type = job.pop('output_type', 'csv')
+    output_path = job.pop('output_path', os.path.join(output_dir, f'{name}.{output_type}'))
+    result = {'name': name, 'type': job_type, 'status': 'failed', 'output_path': output_path, 'n_meals': 0, 'seconds': 0, 'error': None}
+
+    started_at = time.monotonic()
+    try:
+        if job_type not in JOB_TYPES:
+            raise ValueError(f'Invalid job type {job_type}, please use filter, search or random.')
+        if output_type not in writers.OUTPUT_WRITERS:
+            raise ValueError(f'Invalid output type {output_type}, please use csv, jsonl or parquet.')
+        method, parameters = JOB_TYPES[job_type]
+        unknown = sorted(set(job) - set(parameters))
+        if unknown:
+            raise ValueError(f'Invalid parameters {unknown} for a {job_type} job.')
+        _validate_types(job_type, job)
+
+        n_meals = writers.write_records(getattr(client, method)(**job), output_type, output_path)
+        result.update(status='ok' if n_meals else 'empty', n_meals=n_meals)
+    except Exception as err:
+        logging.error(f'Job {name} failed.', extra={'error': err})
+        result['error'] = str(err)
+    result['seconds'] = round(time.monotonic() - started_at, 3)
+
+    return result
+
+
+def run_batch(client, jobs, output_dir='./batch_output', workers=8):
+    """
+    Runs jobs concurrently over a shared client, so they share its session, cache and rate limiter,
+    and writes a summary of the batch to output_dir/summary.json.
+
+    Parameters
+    ----------
+        client (MealDBClient): Client running every job.
+
+        jobs (list): Jobs dicts, see read_jobs and run_job.
+
+        output_dir (str): Directory the outputs and the summary are written to, default './batch_output'.
+
+        workers (int): Maximum number of jobs running at once, default 8.
+
+    Returns
+    -------
+        summary (dict) : Number of jobs per status, seconds, results of every job and the client's request stats.
+
+    Raises
+    ------
+        ValueError : If several jobs have the same name, their outputs would overwrite each other.
+    """
+    names = [_job_name(job, index) for index, job in enumerate(jobs)]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f'Duplicate job names {duplicates}, please give every job its own name.')
+
+    os.makedirs(output_dir, exist_ok=True)
+    logging.info(f'Running {len(jobs)} jobs with {workers} workers.')
+
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        results = list(executor.map(lambda args: run_job(client, args[1], output_dir, args[0]), enumerate(jobs)))
+
+    summary = {
+        'jobs': len(results),
+        'ok': sum(result['status'] == 'ok' for result in results),
+        'empty': sum(result['status'] == 'empty' for result in results),
+        'failed': sum(result['status'] == 'failed' for result in results),
+        'seconds': round(time.monotonic() - started_at, 3),
+        'results': results,
+        'requests': client.stats.summary()
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    logging.info(f"Ran {summary['jobs']} jobs in {summary['seconds']}s: {summary['ok']} ok, "
+                 f"{summary['empty']} empty, {summary['failed']} failed.")
+
+    return summary
\ No newline at end of file
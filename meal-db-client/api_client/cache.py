@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+"""A persistent cache for The Meal DB API responses, stored in a local SQLite file."""
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'meal_db')
+
+# Seconds each endpoint response stays fresh. Endpoints missing here (eg: random.php) are never cached.
+DEFAULT_TTLS = {
+    'list.php': 7 * 24 * 60 * 60,
+    'filter.php': 24 * 60 * 60,
+    'lookup.php': 7 * 24 * 60 * 60,
+    'search.php': 24 * 60 * 60
+}
+
+# Cache hits whose access time is kept in memory before being written to the cache file in one transaction.
+ACCESS_FLUSH_SIZE = 100
+
+
+class ResponseCache:
+    """
+    Parameters
+    ----------
+        cache_dir (str): Directory where the cache file is stored, default '~/.cache/meal_db'.
+
+        ttls (dict): Seconds a response stays fresh per endpoint, eg: {'filter.php': 3600}.
+                     Merged into DEFAULT_TTLS, set an endpoint to None to disable its caching.
+
+        max_entries (int): Maximum number of cached responses, the least recently used are evicted first, default 10000.
+
+    Cache hits only read the cache file: their access times are written in batches, with the next stored response
+    or every ACCESS_FLUSH_SIZE hits, so warm reads don't turn into writes.
+
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttls=None, max_entries=10000):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'responses.sqlite')
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        self._conn.commit()
+        self._n_entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        self._accessed = {}
+
+    def _ttl(self, url):
+        """
+        Returns the time to live of an url according to its endpoint, eg: '.../filter.php?c=Seafood' -> ttls['filter.php'].
+        """
+        endpoint = url.split('?')[0].rsplit('/', 1)[-1]
+        return self.ttls.get(endpoint)
+
+    def get(self, url):
+        """
+        Get a fresh cached response body.
+
+        Parameters
+        ----------
+            url (str): Full url of the request.
+
+        Returns
+        -------
+            body (str) : Cached response body, or None if the url is not cached, expired or not cacheable.
+        """
+        ttl = self._ttl(url)
+        if ttl is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT body, created_at FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+
+            self._accessed[url] = now
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self._conn.commit()
+            self.hits += 1
+
+        logging.debug('Response cache hit.', extra={'url': url})
+        return row[0]
+
+    def set(self, url, body):
+        """
+        Stores a response body, evicting the least recently used responses above max_entries.
+
+        Parameters
+        ----------
+            url (str): Full url of the request.
+
+            body (str): Response body to cache.
+        """
+        if self._ttl(url) is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._flush_accessed()
+            is_new = self._conn.execute('SELECT 1 FROM responses WHERE url = ?', (url,)).fetchone() is None
+            self._conn.execute('INSERT OR REPLACE INTO responses (url, body, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                               (url, body, now, now))
+            self._n_entries += int(is_new)
+            if self._n_entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_accessed(self):
+        """
+        Writes the access times of the cache hits kept in memory, in the caller's transaction.
+        """
+        if self._accessed:
+            self._conn.executemany('UPDATE responses SET accessed_at = ? WHERE url = ?',
+                                   [(accessed_at, url) for url, accessed_at in self._accessed.items()])
+            self._accessed = {}
+
+    def _evict(self):
+        """
+        Deletes the least recently used responses above max_entries, walking the accessed_at index from the oldest.
+        The count is read again first, as other processes may share the cache file.
+        """
+        self._n_entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        n_evicted = self._n_entries - self.max_entries
+        if n_evicted > 0:
+            self._conn.execute('DELETE FROM responses WHERE url IN (SELECT url FROM responses ORDER BY accessed_at LIMIT ?)',
+                               (n_evicted,))
+            self._n_entries = self.max_entries
+
+    def stats(self):
+        """
+        Returns
+        -------
+            stats (dict) : Number of cache hits, misses and cached responses.
+        """
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def clear(self):
+        """
+        Removes all the cached responses.
+        """
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._n_entries = 0
+            self._accessed = {}
+
+    def close(self):
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
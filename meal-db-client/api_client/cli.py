@@ -4,6 +4,46 @@ import sys
 import json
 
 from api_client import meal_db
+from api_client import batch as batch_jobs
+from api_client.cache import DEFAULT_CACHE_DIR, ResponseCache
+from api_client.mirror import DEFAULT_MIRROR_PATH, MealDBMirror
+from api_client.rate_limit import AdaptiveRateLimiter
+
+_SESSION = None
+
+def _output_options(command):
+    """
+    A decorator adding the output file options to a command.
+    """
+    command = click.option('--output_path', '--csv_path', '-p', 'output_path', help='File path of the output, default ./output.{output_type}.', default=None)(command)
+    command = click.option('--output_type', '-o', help='Format of the output file.', type=click.Choice(['csv', 'jsonl', 'parquet']), default='csv')(command)
+    return command
+
+def _rate_limit_option(command):
+    """
+    A decorator adding the adaptive rate limit option to a command.
+    """
+    return click.option('--max_rate', '-r', help='Maximum requests per second, adapted down on 429s and slow responses.', default=None, type=float)(command)
+
+def _stats_option(command):
+    """
+    A decorator adding the option to print the request stats of a command.
+    """
+    return click.option('--stats', 'print_stats', help='Print a JSON summary of the requests sent at exit.', is_flag=True, default=False)(command)
+
+def _cache_options(command):
+    """
+    A decorator adding the response cache options to a command.
+    """
+    command = click.option('--cache-dir', 'cache_dir', help='Directory of the local response cache.', default=DEFAULT_CACHE_DIR)(command)
+    command = click.option('--cache/--no-cache', help='Reuse cached list, filter and search responses.', default=True)(command)
+    return command
+
+def _prompt_missing(values, text):
+    """
+    A helper to prompt for a single value of a repeatable option left out of the command line.
+    """
+    return values or (click.prompt(text),)
 
 @click.group()
 def cli():
@@ -11,37 +51,62 @@ def cli():
     Command-line tool to to pull data from The Meal DB public API.
     \b
     Includes: \n
-        1. Pull meals basic info filtering by category, area or ingredient value. \n
+        1. Pull meals basic info filtering by one or more category, area or ingredient values. \n
         2. Pull meals recipes data based on a meal name or meal id search value. \n
         3. Pull recipes data of n random meals. \n
+        4. Crawl the recipes of the whole catalog, resuming an interrupted crawl. \n
+        5. Sync a local mirror of the catalog, used by filter and search with --mirror_path. \n
+        6. Pull only the recipes added or changed since the previous sync. \n
+        7. Download the thumbnails of the meals of a csv, jsonl or parquet file. \n
+        8. Run a file of filter, search and random jobs concurrently in one process. \n
     \b
     Commands: \n
         1. python meal_db_client.py filter -k ./config.json -ft category -fv Breakfast -o csv \n
-        2. python meal_db_client.py search -k ./config.json -st meal_name -sv Carbonara \n
-        3. python meal_db_client.py random -k ./config.json -n 50 \n
+           python meal_db_client.py filter -k ./config.json -ft ingredient -fv chicken -ft ingredient -fv garlic -ft area -fv Italian --details \n
+        2. python meal_db_client.py search -k ./config.json -st meal_name -sv Carbonara -o parquet -p ./carbonara.parquet \n
+        3. python meal_db_client.py random -k ./config.json -n 50 -w 8 --unique \n
+        4. python meal_db_client.py crawl -k ./config.json -p ./meals.jsonl -w 8 \n
+        5. python meal_db_client.py mirror -k ./config.json -m ./mirror.sqlite \n
+        6. python meal_db_client.py sync -k ./config.json -p ./meals_delta.jsonl -s ./meals.sync.json \n
+        7. python meal_db_client.py thumbnails -k ./config.json -i ./output.csv -d ./thumbnails -w 16 \n
+        8. python meal_db_client.py batch -k ./config.json -j ./jobs.jsonl -d ./batch_output -w 8 \n
     \b
     Help: python meal_db_client.py ---help
     """
+    logging.basicConfig(level=logging.INFO)
 @cli.command()
 @click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
-@click.option('--filter_type', '-ft', prompt='Which filter would you like to apply: category, area or ingredient?', required=True)
-@click.option('--filter_value', '-fv', prompt='Which value should be used for filtering?', required=True)
+@click.option('--filter_type', '-ft', 'filter_types', help='Filter type, can be repeated once per filter value or given once for all of them.', multiple=True)
+@click.option('--filter_value', '-fv', 'filter_values', help='Filter value, can be repeated to combine several filters.', multiple=True)
+@click.option('--match', 'how', help='Keep the meals matching all the filters or any of them.', type=click.Choice(['and', 'or']), default='and')
+@click.option('--details/--no-details', help='Pull the full recipes of the meals found instead of their basic info.', default=False)
+@click.option('--workers', '-w', help='Number of concurrent requests to the API.', default=8, type=int)
 @click.option('--n_meals', '-n', help='Number of meals to limit the filter.', default=None)
-@click.option('--csv_path', '-p', help='File path if you selected csv as output type.', default='./output.csv')
+@_rate_limit_option
+@_output_options
+@_cache_options
+@_stats_option
+@click.option('--mirror_path', '-m', help='Local mirror answering the filter while it is fresh, see the mirror command.', default=None)
 @click.option('--debug/--no-debug', default=False)
 
-def filter(key_config, filter_type, filter_value, n_meals, csv_path, debug):
+def filter(key_config, filter_types, filter_values, how, details, workers, n_meals, max_rate, output_type, output_path, cache, cache_dir, mirror_path, print_stats, debug):
     if debug:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    key = _load_config(json_path=key_config)['api_key']
-    client = meal_db.MealDBClient(key)
+    filter_types = _prompt_missing(filter_types, 'Which filter would you like to apply: category, area or ingredient?')
+    filter_values = _prompt_missing(filter_values, 'Which value should be used for filtering?')
+    filter_type = filter_types[0] if len(filter_types) == 1 else list(filter_types)
+    client = _get_client(key_config, pool_size=workers, cache_dir=cache_dir if cache else None, mirror_path=mirror_path, max_rate=max_rate,
+                         print_stats=print_stats)
     try:
         if n_meals: 
-            client.get_meals_filter_by(filter_type=filter_type, filter_value=filter_value, n_meals=int(n_meals), output_type='csv', csv_path=csv_path)
+            client.get_meals_filter_by(filter_type=filter_type, filter_value=list(filter_values), n_meals=int(n_meals), output_type=output_type, output_path=output_path,
+                                       how=how, details=details, workers=workers)
         else:
-            client.get_meals_filter_by(filter_type=filter_type, filter_value=filter_value, output_type='csv', csv_path=csv_path)
+            client.get_meals_filter_by(filter_type=filter_type, filter_value=list(filter_values), output_type=output_type, output_path=output_path,
+                                       how=how, details=details, workers=workers)
         logging.info('Successfully pulled data from API.')
+        _log_client_stats(client)
     except Exception as err:
         logging.error('Pulling data process failed.', extra={'error': err})
         sys.exit(err)
@@ -50,18 +115,21 @@ def filter(key_config, filter_type, filter_value, n_meals, csv_path, debug):
 @click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
 @click.option('--search_type', '-st', prompt='Which search would you like to apply: meal_id or meal_name?', required=True)
 @click.option('--search_value', '-sv', prompt='Which value should be used for searching?', required=True)
-@click.option('--csv_path', '-p', help='File path if you selected csv as output type.', default='./output.csv')
+@_output_options
+@_cache_options
+@_stats_option
+@click.option('--mirror_path', '-m', help='Local mirror answering the search while it is fresh, see the mirror command.', default=None)
 @click.option('--debug/--no-debug', default=False)
 
-def search(key_config, search_type, search_value, csv_path, debug):
+def search(key_config, search_type, search_value, output_type, output_path, cache, cache_dir, mirror_path, print_stats, debug):
     if debug:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    key = _load_config(json_path=key_config)['api_key']
-    client = meal_db.MealDBClient(key)
+    client = _get_client(key_config, cache_dir=cache_dir if cache else None, mirror_path=mirror_path, print_stats=print_stats)
     try:
-        client.get_meals_search_by(search_type=search_type, search_value=search_value, output_type='csv', csv_path=csv_path)
+        client.get_meals_search_by(search_type=search_type, search_value=search_value, output_type=output_type, output_path=output_path)
         logging.info('Successfully pulled data from API.')
+        _log_client_stats(client)
     except Exception as err:
         logging.error('Pulling data process failed.', extra={'error': err})
         sys.exit(err)
@@ -69,22 +137,206 @@ def search(key_config, search_type, search_value, csv_path, debug):
 @cli.command()
 @click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
 @click.option('--n_meals', '-n', help='Number of meals to limit the filter.', required=True)
-@click.option('--csv_path', '-p', help='File path if you selected csv as output type.', default='./output.csv')
+@click.option('--workers', '-w', help='Number of concurrent requests to the API.', default=1, type=int)
+@click.option('--unique/--no-unique', help='Pull n distinct meals, sampling the catalog once random.php repeats itself.', default=False)
+@_rate_limit_option
+@_output_options
+@_cache_options
+@_stats_option
 @click.option('--debug/--no-debug', default=False)
 
-def random(key_config, n_meals, csv_path, debug):
+def random(key_config, n_meals, workers, unique, max_rate, output_type, output_path, cache, cache_dir, print_stats, debug):
     if debug:
         logging.getLogger().setLevel(logging.DEBUG)
     
-    key = _load_config(json_path=key_config)['api_key']
-    client = meal_db.MealDBClient(key)
+    client = _get_client(key_config, pool_size=workers, cache_dir=cache_dir if cache else None, max_rate=max_rate, print_stats=print_stats)
     try:
-        client.get_meals_random(int(n_meals), output_type='csv', csv_path=csv_path)
+        client.get_meals_random(int(n_meals), workers=workers, output_type=output_type, output_path=output_path, unique=unique)
         logging.info('Successfully pulled data from API.')
+        _log_client_stats(client)
     except Exception as err:
         logging.error('Pulling data process failed.', extra={'error': err})
         sys.exit(err)
 
+@cli.command()
+@click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
+@click.option('--output_path', '-p', help='JSON lines file the recipes are appended to.', default='./meals.jsonl')
+@click.option('--checkpoint_path', '-c', help='Crawl checkpoint file, default output_path + .checkpoint.', default=None)
+@click.option('--filter_type', '-ft', 'filter_types', help='Filter types used to find the meals, can be repeated.',
+              type=click.Choice(['category', 'area', 'ingredient']), multiple=True, default=['category', 'area', 'ingredient'])
+@click.option('--workers', '-w', help='Number of concurrent requests to the API.', default=8, type=int)
+@_rate_limit_option
+@_cache_options
+@_stats_option
+@click.option('--debug/--no-debug', default=False)
+
+def crawl(key_config, output_path, checkpoint_path, filter_types, workers, max_rate, cache, cache_dir, print_stats, debug):
+    if debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    client = _get_client(key_config, pool_size=workers, cache_dir=cache_dir if cache else None, max_rate=max_rate, print_stats=print_stats)
+    try:
+        client.crawl(output_path=output_path, checkpoint_path=checkpoint_path, filter_types=filter_types, workers=workers)
+        logging.info('Successfully pulled data from API.')
+        _log_client_stats(client)
+    except Exception as err:
+        logging.error('Crawling process failed, run the same command again to resume it.', extra={'error': err})
+        sys.exit(err)
+
+@cli.command()
+@click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
+@click.option('--output_path', '-p', help='File the new and changed recipes are written to.', default='./meals_delta.jsonl')
+@click.option('--output_type', '-o', help='Format of the output file.', type=click.Choice(['csv', 'jsonl', 'parquet']), default='jsonl')
+@click.option('--state_path', '-s', help='Sync state file, keeping the hash of every meal synced.', default='./meals.sync.json')
+@click.option('--full/--no-full', help='Look up every meal to catch edits the filter summaries do not show.', default=False)
+@click.option('--workers', '-w', help='Number of concurrent requests to the API.', default=8, type=int)
+@_rate_limit_option
+@_stats_option
+@click.option('--debug/--no-debug', default=False)
+
+def sync(key_config, output_path, output_type, state_path, full, workers, max_rate, print_stats, debug):
+    if debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    # No response cache: a cached filter or lookup would hide the changes the sync is looking for.
+    client = _get_client(key_config, pool_size=workers, max_rate=max_rate, print_stats=print_stats)
+    try:
+        client.sync(output_path=output_path, state_path=state_path, output_type=output_type, full=full, workers=workers)
+        logging.info('Successfully pulled data from API.')
+        _log_client_stats(client)
+    except Exception as err:
+        logging.error('Syncing process failed.', extra={'error': err})
+        sys.exit(err)
+
+@cli.command()
+@click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
+@click.option('--mirror_path', '-m', help='SQLite file of the local mirror.', default=DEFAULT_MIRROR_PATH)
+@click.option('--workers', '-w', help='Number of concurrent requests to the API.', default=8, type=int)
+@_rate_limit_option
+@_stats_option
+@click.option('--debug/--no-debug', default=False)
+
+def mirror(key_config, mirror_path, workers, max_rate, print_stats, debug):
+    if debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    # No response cache: the mirror is stamped fresh when synced, it must not be built from old cached responses.
+    client = _get_client(key_config, pool_size=workers, mirror_path=mirror_path, max_rate=max_rate, print_stats=print_stats)
+    try:
+        client.sync_mirror(workers=workers)
+        logging.info('Successfully pulled data from API.')
+        _log_client_stats(client)
+    except Exception as err:
+        logging.error('Mirroring process failed.', extra={'error': err})
+        sys.exit(err)
+
+@cli.command()
+@click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
+@click.option('--input_path', '-i', prompt='Which csv, jsonl or parquet file of meals should the thumbnails be downloaded for?', required=True)
+@click.option('--output_dir', '-d', help='Directory the images are stored in, under the hash of their content.', default='./thumbnails')
+@click.option('--workers', '-w', help='Number of concurrent downloads.', default=8, type=int)
+@click.option('--debug/--no-debug', default=False)
+
+def thumbnails(key_config, input_path, output_dir, workers, debug):
+    if debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    # No rate limiter nor request stats: the images come from the CDN, not the API, download_thumbnails logs its own summary.
+    client = _get_client(key_config, pool_size=workers)
+    try:
+        client.download_thumbnails(input_path, output_dir=output_dir, workers=workers)
+        logging.info('Successfully downloaded the thumbnails.')
+    except Exception as err:
+        logging.error('Downloading thumbnails process failed, run the same command again to resume it.', extra={'error': err})
+        sys.exit(err)
+
+@cli.command()
+@click.option('--key_config', '-k', prompt='Enter the config containing your API key.', default='./config.json')
+@click.option('--jobs_path', '-j', prompt='Which jsonl or yaml file of jobs should be run?', required=True)
+@click.option('--output_dir', '-d', help='Directory the output of every job and the summary.json are written to.', default='./batch_output')
+@click.option('--workers', '-w', help='Number of jobs running at once.', default=8, type=int)
+@_rate_limit_option
+@_cache_options
+@_stats_option
+@click.option('--debug/--no-debug', default=False)
+
+def batch(key_config, jobs_path, output_dir, workers, max_rate, cache, cache_dir, print_stats, debug):
+    if debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        jobs = batch_jobs.read_jobs(jobs_path)
+    except Exception as err:
+        raise click.ClickException(f'Could not read the jobs of {jobs_path}: {err}')
+    if jobs is None:
+        sys.exit(1)
+
+    client = _get_client(key_config, pool_size=workers, cache_dir=cache_dir if cache else None, max_rate=max_rate, print_stats=print_stats)
+    try:
+        summary = batch_jobs.run_batch(client, jobs, output_dir=output_dir, workers=workers)
+        logging.info('Successfully pulled data from API.')
+        _log_client_stats(client)
+    except Exception as err:
+        logging.error('Batch process failed.', extra={'error': err})
+        sys.exit(err)
+    if summary['failed']:
+        sys.exit(f"{summary['failed']} of {summary['jobs']} jobs failed, see {output_dir}/summary.json.")
+
+def _get_session(pool_size=10):
+    """
+    A helper to share one pooled requests.Session between all the clients created in this process.
+    Parameters
+    ----------
+        pool_size (int): Minimum number of keep-alive connections, only used when the session is created.
+
+    Returns
+    -------
+        session (requests.Session): The process-wide session.
+    """
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = meal_db.create_session(pool_size=max(pool_size, 10))
+    return _SESSION
+
+def _get_client(key_config, pool_size=10, cache_dir=None, mirror_path=None, max_rate=None, print_stats=False):
+    """
+    A helper to create a MealDBClient from a config file, sharing the process-wide session.
+    Parameters
+    ----------
+        key_config (str): Absolute path of the config containing the API key.
+
+        pool_size (int): Minimum number of keep-alive connections, eg: the number of workers.
+
+        cache_dir (str): Directory of the local response cache, default None (no cache).
+
+        mirror_path (str): SQLite file of the local mirror, default None (no mirror).
+
+        max_rate (float): Maximum requests per second of the adaptive rate limiter, default None (no limit).
+
+        print_stats (bool): Whether to print the JSON summary of the client's requests when the command exits.
+
+    Returns
+    -------
+        client (MealDBClient): Client ready to pull data from the API.
+    """
+    key = _load_config(json_path=key_config)['api_key']
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    mirror = MealDBMirror(mirror_path) if mirror_path else None
+    rate_limiter = AdaptiveRateLimiter(rate=max_rate, max_rate=max_rate, max_concurrency=pool_size) if max_rate else None
+    client = meal_db.MealDBClient(key, session=_get_session(pool_size), cache=cache, mirror=mirror, rate_limiter=rate_limiter)
+    if print_stats:
+        click.get_current_context().call_on_close(lambda: click.echo(json.dumps(client.stats.summary(), indent=2)))
+    return client
+
+def _log_client_stats(client):
+    """
+    A helper to log the counters of the client's response cache and rate limiter, if any.
+    """
+    if client.cache is not None:
+        logging.info(f'Response cache stats: {client.cache.stats()}.')
+    if client.rate_limiter is not None:
+        logging.info(f'Rate limiter stats: {client.rate_limiter.stats()}.')
+
 def _load_config(json_path):
     """
     A helper to read the API key from a config file. 
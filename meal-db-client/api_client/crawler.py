@@ -0,0 +1,131 @@
+import os
+import json
+import hashlib
+import logging
+
+"""Helpers to checkpoint and resume a full-catalog crawl of The Meal DB, and to keep the state of incremental syncs."""
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Reads the meal ids saved by an interrupted crawl.
+
+    Parameters
+    ----------
+        checkpoint_path (str): Path of the crawl checkpoint.
+
+    Returns
+    -------
+        meal_ids (list) : Meal ids to crawl, or None if there is no checkpoint.
+    """
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['meal_ids']
+
+
+def save_checkpoint(checkpoint_path, meal_ids):
+    """
+    Atomically saves the meal ids to crawl, so a crash never leaves a half-written checkpoint.
+
+    Parameters
+    ----------
+        checkpoint_path (str): Path of the crawl checkpoint.
+
+        meal_ids (list): Meal ids to crawl.
+    """
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'meal_ids': meal_ids}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def remove_checkpoint(checkpoint_path):
+    """
+    Removes the checkpoint of a completed crawl.
+    """
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+
+def read_done_ids(output_path):
+    """
+    Reads the ids of the meals already written to a crawl output.
+    A trailing line left incomplete by an interrupted crawl is truncated from the file.
+
+    Parameters
+    ----------
+        output_path (str): Path of the JSON lines crawl output.
+
+    Returns
+    -------
+        done_ids (set) : Ids of the meals in the output.
+    """
+    done_ids = set()
+    if not os.path.exists(output_path):
+        return done_ids
+
+    valid_size = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError('Record without line ending.')
+                done_ids.add(json.loads(line)['idMeal'])
+            except (ValueError, KeyError):
+                logging.warning(f'Truncating incomplete record at the end of {output_path}.')
+                break
+            valid_size += len(line)
+
+    if valid_size < os.path.getsize(output_path):
+        with open(output_path, 'r+b') as f:
+            f.truncate(valid_size)
+
+    return done_ids
+
+
+def content_hash(record):
+    """
+    Hashes a JSON record independently of its key order, eg: a meal summary or recipe.
+
+    Returns
+    -------
+        hash (str) : Hex SHA-1 digest of the record.
+    """
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_sync_state(state_path):
+    """
+    Reads the state of the previous incremental sync.
+
+    Parameters
+    ----------
+        state_path (str): Path of the sync state file.
+
+    Returns
+    -------
+        state (dict) : idMeal -> {summary, hash, dateModified} of the meals synced so far, empty before the first sync.
+    """
+    if not os.path.exists(state_path):
+        return {}
+
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['meals']
+
+
+def save_sync_state(state_path, state):
+    """
+    Atomically saves the state of an incremental sync, so a crash keeps the previous state intact.
+
+    Parameters
+    ----------
+        state_path (str): Path of the sync state file.
+
+        state (dict): idMeal -> {summary, hash, dateModified} of the meals synced.
+    """
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'meals': state}, f)
+    os.replace(tmp_path, state_path)
\ No newline at end of file
@@ -1,11 +1,163 @@
 import requests
-import pandas as pd
 import logging
-logging.basicConfig()
-logging.getLogger().setLevel(logging.INFO)
+import json
+import time
+import random
+import copy
+from collections import deque
+from itertools import islice
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from api_client import crawler
+from api_client import writers
+from api_client import thumbnails
+from api_client.stats import RequestStats
+from api_client.single_flight import SingleFlight
 
 """A class to connect and get data from The Meal DB public API https://www.themealdb.com/api.php."""
 
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+# Duplicate random.php responses tolerated by get_meals_random(unique=True) before it samples the meal ids locally,
+# about the number of calls needed to enumerate the ids through the category filters.
+RANDOM_DUPLICATES_BUDGET = 15
+
+# Endpoints whose concurrent identical calls must not share a response.
+UNCOALESCED_ENDPOINTS = ['/random.php']
+
+# Filter and search types accepted by the client.
+FILTER_TYPES = ['ingredient', 'category', 'area']
+SEARCH_TYPES = ['meal_name', 'meal_id']
+
+# Key holding each filter value in the list.php response.
+FILTER_VALUE_KEYS = {
+    'category': 'strCategory',
+    'area': 'strArea',
+    'ingredient': 'strIngredient'
+}
+
+
+def create_session(pool_size=10, max_retries=3, backoff_factor=0.5):
+    """
+    Creates a requests.Session with a keep-alive connection pool that retries failed requests.
+
+    Parameters
+    ----------
+        pool_size (int) : Maximum number of connections kept alive per host, default 10.
+
+        max_retries (int) : Maximum number of retries on connection errors and 429/5xx responses, default 3.
+
+        backoff_factor (float) : Exponential backoff between retries: backoff_factor * 2 ** (retry - 1) seconds, default 0.5.
+
+    Returns
+    -------
+        session (requests.Session) : Session to be shared by one or more MealDBClient.
+    """
+    retry = Retry(total=max_retries,
+                  backoff_factor=backoff_factor,
+                  status_forcelist=RETRY_STATUS_CODES,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.headers.update({'Connection': 'keep-alive'})
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _retry_history(response):
+    """
+    The attempts of a request retried by the session, as recorded by urllib3.
+    """
+    retries = getattr(response.raw, 'retries', None)
+    return retries.history if retries is not None else ()
+
+
+def _is_congested(response):
+    """
+    Whether the API throttled or failed a request, including the attempts retried by the session.
+    """
+    return (response.status_code in RETRY_STATUS_CODES
+            or any(attempt.error is not None or attempt.status in RETRY_STATUS_CODES for attempt in _retry_history(response)))
+
+
+def filter_endpoint(filter_type, filter_value):
+    """
+    Builds the filter.php endpoint of a filter, eg: ('category', 'Seafood') -> '/filter.php?c=Seafood'.
+    The value is percent-encoded, eg: ('ingredient', 'Salt & Pepper') -> '/filter.php?i=Salt%20%26%20Pepper'.
+
+    Returns
+    -------
+        filter_endpoint (str) : Endpoint to call in the API, or None if the filter type is not valid.
+    """
+    if filter_type not in FILTER_TYPES:
+        logging.error("Please insert a valid filter type: ingredient, category or area.") 
+        return
+
+    return f'/filter.php?{filter_type[0]}={quote(str(filter_value), safe="")}'
+
+
+def _combine_meals(list_results, how='and'):
+    """
+    Combines the meals returned by several filters on their idMeal, eg: the meals with chicken and the meals with garlic.
+
+    Parameters
+    ----------
+        list_results (list): Meals basic info returned by each filter.
+
+        how (str): 'and' to keep the meals returned by all the filters (intersection), 'or' by any (union), default 'and'.
+
+    Returns
+    -------
+        list_meals (list) : Meals basic info, in the order the filters returned them.
+    """
+    meals = {}
+    for results in list_results:
+        for meal in results:
+            meals.setdefault(meal['idMeal'], meal)
+
+    if how == 'and':
+        meal_ids = set.intersection(*sorted(({meal['idMeal'] for meal in results} for results in list_results), key=len))
+        return [meal for meal_id, meal in meals.items() if meal_id in meal_ids]
+    return list(meals.values())
+
+
+def _batched(records, batch_size=None):
+    """
+    Yields the records one by one, or in lists of up to batch_size records.
+    """
+    if not batch_size:
+        yield from records
+        return
+
+    records = iter(records)
+    batch = list(islice(records, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(records, batch_size))
+
+
+def search_endpoint(search_type, search_value):
+    """
+    Builds the search.php or lookup.php endpoint of a search, eg: ('meal_id', '52772') -> '/lookup.php?i=52772'.
+    The value is percent-encoded, like filter_endpoint.
+
+    Returns
+    -------
+        search_endpoint (str) : Endpoint to call in the API, or None if the search type is not valid.
+    """
+    if search_type == 'meal_name':
+        return f'/search.php?s={quote(str(search_value), safe="")}'
+    elif search_type == 'meal_id':
+        return f'/lookup.php?i={quote(str(search_value), safe="")}'
+    else:
+        logging.error("Please insert a valid search type: meal_name or meal_id.") 
+        return
+
+
 class MealDBClient:
     """
     Parameters   
@@ -16,13 +168,45 @@ class MealDBClient:
         key (str): API key for authentication, for app development phase use '1'
                    For a production API key, signup as Patreon supporter.
 
+        session (requests.Session): Session used for every request, default None (a new pooled session is created).
+                                    Pass the same session to several clients to share its connections.
+
+        pool_size (int): Maximum number of keep-alive connections when creating a new session, default 10.
+
+        timeout (float): Seconds to wait for the server to connect and respond, default 10.
+
+        max_retries (int): Retries on connection errors and 429/5xx responses when creating a new session, default 3.
+
+        backoff_factor (float): Exponential backoff factor between retries when creating a new session, default 0.5.
+
+        cache (ResponseCache): Persistent cache for list, filter, lookup and search responses, default None (no cache).
+
+        mirror (MealDBMirror): Local copy of the catalog answering filters and searches while it's fresh, default None (no mirror).
+
+        rate_limiter (AdaptiveRateLimiter): Rate and concurrency limit shared by every request of the client,
+                                            adapted to 429s and latency spikes, default None (no limit).
+
+    Attributes
+    ----------
+        stats (RequestStats): Request count, bytes, retries, errors, cache hits and latency histogram per endpoint,
+                              eg: client.stats.summary().
+
     """
-    def __init__(self, key, api_base_url = 'https://www.themealdb.com/api/json/v1'):
+    def __init__(self, key, api_base_url = 'https://www.themealdb.com/api/json/v1', session=None,
+                 pool_size=10, timeout=10, max_retries=3, backoff_factor=0.5, cache=None, mirror=None, rate_limiter=None):
         self.url_base = f'{api_base_url}/{key}'
+        self.timeout = timeout
+        self.session = session or create_session(pool_size=pool_size, max_retries=max_retries, backoff_factor=backoff_factor)
+        self.cache = cache
+        self.mirror = mirror
+        self.rate_limiter = rate_limiter
+        self.stats = RequestStats()
+        self._single_flight = SingleFlight()
     
     def _connect_api(self, endpoint):
         """
-        Establishes connection to API using Python requests package.
+        Establishes connection to API using the client's pooled requests.Session.
+        Connection errors and 429/5xx responses are retried with exponential backoff.
 
         Parameters
         ----------
@@ -31,43 +215,139 @@ class MealDBClient:
         Returns
         -------
             response (object): Server's response to the HTTP request.
+
+        Raises
+        ------
+            requests.exceptions.RequestException : If the API could not be reached after all retries.
         """
         url = self.url_base + endpoint
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        started_at = time.monotonic()
+        response = None
         try:
-            response = requests.get(url)
+            response = self.session.get(url, timeout=self.timeout)
             response.encoding = 'utf-8'
             logging.info('Successfully connected to API.', extra={'url': url})
             return response
         except requests.exceptions.RequestException as err:
             logging.error("Could not connect to the API. Can you verify the input parameters?",extra={'error': err})  
-            raise SystemExit(err)
-            
-    def _output_type(self, df, output_type, csv_path):
+            raise
+        finally:
+            latency = time.monotonic() - started_at
+            if response is not None:
+                self.stats.record_request(endpoint, latency, n_bytes=len(response.content),
+                                          retries=len(_retry_history(response)), error=response.status_code >= 400)
+            else:
+                self.stats.record_request(endpoint, latency, error=True)
+            if self.rate_limiter is not None:
+                self.rate_limiter.release(response is None or _is_congested(response), latency)
+
+    def _get_json(self, endpoint):
+        """
+        Gets the parsed JSON of an endpoint, from the cache when it holds a fresh response.
+        Threads asking for an endpoint already in flight wait for that request and share its parsed JSON,
+        except for random.php whose every call must return its own meal.
+
+        Parameters
+        ----------
+            endpoint (str): The endpoint to call in the API.
+
+        Returns
+        -------
+            dict_response (dict): Parsed JSON body of the server's response, shared between concurrent callers.
+        """
+        url = self.url_base + endpoint
+        if self.cache is not None:
+            body = self.cache.get(url)
+            if body is not None:
+                self.stats.record_cache_hit(endpoint)
+                return json.loads(body)
+
+        if endpoint in UNCOALESCED_ENDPOINTS:
+            return self._fetch_json(endpoint)
+
+        dict_response, shared = self._single_flight.do(url, lambda: self._fetch_json(endpoint))
+        if shared:
+            self.stats.record_coalesced(endpoint)
+        return dict_response
+
+    def _fetch_json(self, endpoint):
+        """
+        Calls an endpoint and caches its response when the client has a cache.
+
+        Returns
+        -------
+            dict_response (dict): Parsed JSON body of the server's response.
+        """
+        url = self.url_base + endpoint
+        response = self._connect_api(endpoint)
+        dict_response = response.json()
+        if self.cache is not None and response.status_code == 200:
+            self.cache.set(url, response.text)
+
+        return dict_response
+
+    def _iter_meals(self, endpoints, workers=1):
+        """
+        Calls every endpoint and yields the returned meals as the responses arrive.
+        At most 2 * workers responses are requested ahead of the consumer, so memory stays bounded.
+
+        Parameters
+        ----------
+            endpoints (iterable) : Endpoints to call in the API, eg: ['/random.php', '/random.php'].
+
+            workers (int) : Maximum number of concurrent requests, default 1 (sequential).
+
+        Yields
+        ------
+            dict_meal (dict) : Meals returned by all the endpoints, in the same order as the endpoints.
+        """
+        if workers <= 1:
+            for endpoint in endpoints:
+                yield from self._get_json(endpoint)['meals'] or []
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for endpoint in endpoints:
+                pending.append(executor.submit(self._get_json, endpoint))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()['meals'] or []
+            while pending:
+                yield from pending.popleft().result()['meals'] or []
+
+    def _use_mirror(self):
+        """
+        Whether filters and searches can be answered by the client's mirror instead of the API.
+        """
+        if self.mirror is None:
+            return False
+        if not self.mirror.is_fresh():
+            logging.info('The local mirror is missing or outdated, pulling data from the API.')
+            return False
+        logging.debug('Answering from the local mirror.', extra={'path': self.mirror.path})
+        return True
+
+    def _output_type(self, records, output_type, output_path=None):
         """
         Returns data according to output type.
+        Files are written in chunks while the records are consumed, so a generator of records is never fully held in memory.
 
         Parameters
         ----------
-            df (pandas.DataFrame): Valid DataFrame returned from methods within MealDBClient.
+            records (iterable): Meals dicts returned from methods within MealDBClient.
             
-            output_type (int) : Format of the data outuput: pandas.DataFrame or csv
+            output_type (str) : Format of the data outuput: pandas (pandas.DataFrame), normalized, csv, jsonl or parquet.
 
-            csv_path (str) : Absolute path of where the csv should be downloaded to.
+            output_path (str) : Absolute path of where the file should be written to, default './output.{output_type}'.
 
         Returns
         -------
-            pandas.DataFrame or csv
+            pandas.DataFrame, or None when the data is exported to a file
         """
         
-        if output_type == 'pandas':
-            logging.info(f'Pulling data as a pandas.DataFrame.')
-            return df
-        elif output_type == 'csv':
-            logging.info(f'Exporting data as csv to {csv_path}.')
-            return df.to_csv(csv_path)
-        else:
-            logging.error(f'Please specify a valid output type: pandas or csv.')
-            return
+        return writers.export_records(records, output_type, output_path)
 
     def list_filter_values(self, filter_type): 
         """
@@ -82,27 +362,29 @@ class MealDBClient:
             list_filter_values (list) : List with all possible values for a given filter_type.
         """
 
-        if filter_type not in ['ingredient', 'category', 'area']:
+        if filter_type not in FILTER_TYPES:
             logging.error("Please insert a valid filter type: ingredient, category or area.") 
             return 
 
         list_endpoint = f'/list.php?{filter_type[0]}=list'  
-        response = self._connect_api(list_endpoint)  
-
-        dict_meals = response.json()['meals']
-        list_filter_values = [d['strCategory'] for d in dict_meals] 
+        dict_meals = self._get_json(list_endpoint)['meals']
+        list_filter_values = [d[FILTER_VALUE_KEYS[filter_type]] for d in dict_meals] 
 
         return list_filter_values
             
-    def get_meals_filter_by(self, filter_type, filter_value, n_meals=None, output_type='pandas', csv_path='./output.csv'):
+    def get_meals_filter_by(self, filter_type, filter_value, n_meals=None, output_type='pandas', csv_path=None, output_path=None,
+                            how='and', details=False, workers=8):
         """
         Get the n first meals filtered according to filter_type = filter_value.
+        Several filters can be combined, eg: filter_type=['ingredient', 'ingredient', 'area'],
+        filter_value=['chicken', 'garlic', 'Italian'] for the Italian meals with chicken and garlic.
 
         Parameters
         ----------
-            filter_type (str) : Filter types supported by the API: category, area, ingredient.
+            filter_type (str or list) : Filter types supported by the API: category, area, ingredient.
+                                        A single type applies to every filter value, a list is paired with filter_value.
 
-            filter_value (str): Value to apply filtering, eg: 
+            filter_value (str or list): Value to apply filtering, eg: 
                                 - filter_value = 'Seafood' when filter_type = 'category'
                                 - filter_value = 'French' when  filter_type = 'area'
                                 - filter_value = 'Tofu' when filter_type = 'ingredient'
@@ -110,43 +392,32 @@ class MealDBClient:
             
             n_meals (int) : Maximum number of meals to get, default None (all meals).
             
-            output (int) : Format of the data outuput: pandas.DataFrame or csv
+            output_type (str) : Format of the data outuput: pandas (pandas.DataFrame), csv, jsonl or parquet.
+
+            csv_path (str) : Absolute path of where the csv should be downloaded to, kept for backwards compatibility.
 
-            csv_path (str) : Absolute path of where the csv should be downloaded to.
+            output_path (str) : Absolute path of where the csv, jsonl or parquet file should be written to,
+                                default './output.{output_type}'.
+
+            how (str) : 'and' to get the meals matching all the filters, 'or' to get the meals matching any, default 'and'.
+
+            details (bool) : Whether to look up the full recipes of the meals found, instead of their basic info, default False.
+
+            workers (int) : Maximum number of concurrent requests to the API, default 8.
 
         Returns
         -------
             df_meals : Meals basic info according to input filter criteria.
-                       columns: [idMeal, strMeal, strMealThumb]
-                        - can be returned as a pandas.DataFrame or a csv specified on the csv_path
+                       columns: [idMeal, strMeal, strMealThumb], or the recipes columns with details=True
+                        - can be returned as a pandas.DataFrame or a file specified on the output_path
         """
-
-        if filter_type not in ['ingredient', 'category', 'area']:
-            logging.error("Please insert a valid filter type: ingredient, category or area.") 
+        dict_meals = self._filter_meals(filter_type, filter_value, n_meals=n_meals, how=how, details=details, workers=workers)
+        if dict_meals is None:
             return
 
-        filter_endpoint = f'/filter.php?{filter_type[0]}={filter_value}'
-        response = self._connect_api(filter_endpoint)
-
-        dict_meals = response.json()['meals']
-        if not dict_meals:
-            logging.error(f'Could not find any meal with this filter, please retry with another value.')
-            return
-
-        df_meals = pd.DataFrame(dict_meals)
-
-        if n_meals:
-            df_meals = df_meals.head(n_meals) 
-            if len(df_meals) < n_meals: 
-                logging.info(f'Could not find {n_meals} meals with this filter, returning data for only {len(df_meals)}.')
-            else:
-                logging.info(f'Getting data for {n_meals} meals with the selected filter.')
-        else:
-            logging.info(f'Getting data for {len(df_meals)} meals with the selected filter.')
-            
-        return self._output_type(df_meals, output_type, csv_path)
+        return self._output_type(dict_meals, output_type, output_path or csv_path)
 
-    def get_meals_search_by(self, search_type, search_value, output_type='pandas', csv_path='./output.csv'):
+    def get_meals_search_by(self, search_type, search_value, output_type='pandas', csv_path=None, output_path=None):
         """
         Get all the meals that match a search criteria.
 
@@ -158,7 +429,13 @@ class MealDBClient:
                     - search_value = 'Arrabiata' when search_type = 'meal_name'
                     - search_value = '52772' when  search_type = 'meal_id'
             
-            n_meals (int) : Maximum number of meals to get, optional.
+            output_type (str) : Format of the data outuput: pandas (pandas.DataFrame), csv, jsonl or parquet,
+                                or normalized for (meals, ingredients) DataFrames with one row per ingredient.
+
+            csv_path (str) : Absolute path of where the csv should be downloaded to, kept for backwards compatibility.
+
+            output_path (str) : Absolute path of where the csv, jsonl or parquet file should be written to,
+                                default './output.{output_type}'.
         Returns
         -------
             df_meals (pandas.DataFrame) : DataFrame containing meals recipes that match input search criteria.
@@ -166,47 +443,516 @@ class MealDBClient:
                           strMeal, strMealThumb, strMeasure1 - strMeasure20, strSource, strTags, strYoutube]
         """
 
-        if search_type == 'meal_name':
-            search_endpoint = f'/search.php?s={search_value}'
-        elif search_type == 'meal_id':
-            search_endpoint = f'/lookup.php?i={search_value}'
-        else:
-            logging.error("Please insert a valid search type: meal_name or meal_id.") 
+        dict_meals = self._search_meals(search_type, search_value)
+        if dict_meals is None:
             return
-        
-        response = self._connect_api(search_endpoint)
-        dict_meals = response.json()['meals']
-        if not dict_meals:
-            logging.error(f'Could not find any meal with this search, please retry with another value.')
-            return
-
-        df_meals = pd.DataFrame(dict_meals)
-        logging.info(f'Getting data for {len(df_meals)} meals with this search.')
 
-        return self._output_type(df_meals, output_type, csv_path)
+        return self._output_type(dict_meals, output_type, output_path or csv_path)
 
-    def get_meals_random(self, n_meals=1, output_type='pandas', csv_path='./output.csv'):
+    def get_meals_random(self, n_meals=1, output_type='pandas', csv_path=None, output_path=None, unique=False, workers=1):
         """
         Get n random meals recipes.
 
         Parameters
         ----------
             n_meals (int) : Number of random meals to get, default 1.
+
+            unique (bool) : Whether to get n distinct meals, default False (random.php may return the same meal twice).
+                            Distinct meals are drawn from random.php until it returns too many duplicates,
+                            then the rest is sampled from the meal ids listed through the category filters.
+
+            output_type (str) : Format of the data outuput: pandas (pandas.DataFrame), csv, jsonl or parquet,
+                                or normalized for (meals, ingredients) DataFrames with one row per ingredient.
+                                Files are written in chunks as the responses arrive.
+
+            csv_path (str) : Absolute path of where the csv should be downloaded to, kept for backwards compatibility.
+
+            output_path (str) : Absolute path of where the csv, jsonl or parquet file should be written to,
+                                default './output.{output_type}'.
+
+            workers (int) : Maximum number of concurrent requests to the API, default 1 (sequential).
         Returns
         -------
             df_meals (pandas.DataFrame) : DataFrame containing n random meals recipes.
                 columns: [dateModified, idMeal, strArea, strCategory, strDrinkAlternate, strIngredient1 - strIngredient20,
                           strMeal, strMealThumb, strMeasure1 - strMeasure20, strSource, strTags, strYoutube]
         """
-        random_endpoint = f'/random.php'
+        iter_meals = self._random_meals(n_meals, workers=workers, unique=unique)
+        
+        return self._output_type(iter_meals, output_type, output_path or csv_path)
+
+    def iter_meals_filter_by(self, filter_type, filter_value, n_meals=None, how='and', details=False, workers=8, batch_size=None):
+        """
+        Yield the meals of get_meals_filter_by as plain dicts, as the responses arrive, without building a DataFrame.
+        With details=True, the recipes are looked up lazily: at most 2 * workers responses are held in memory.
+
+        Parameters
+        ----------
+            filter_type, filter_value, n_meals, how, details, workers : See get_meals_filter_by.
+
+            batch_size (int) : Number of meals per yielded list, default None (meals are yielded one by one).
+
+        Yields
+        ------
+            dict_meal (dict or list) : Meals basic info, or recipes with details=True, or lists of batch_size of them.
+        """
+        dict_meals = self._filter_meals(filter_type, filter_value, n_meals=n_meals, how=how, details=details, workers=workers)
+        if dict_meals is None:
+            return
+        yield from _batched(dict_meals, batch_size)
+
+    def iter_meals_search_by(self, search_type, search_value, batch_size=None):
+        """
+        Yield the recipes of get_meals_search_by as plain dicts, without building a DataFrame.
+
+        Parameters
+        ----------
+            search_type, search_value : See get_meals_search_by.
+
+            batch_size (int) : Number of meals per yielded list, default None (meals are yielded one by one).
+
+        Yields
+        ------
+            dict_meal (dict or list) : Recipes matching the search, or lists of batch_size of them.
+        """
+        dict_meals = self._search_meals(search_type, search_value)
+        if dict_meals is None:
+            return
+        yield from _batched(dict_meals, batch_size)
+
+    def iter_meals_random(self, n_meals=1, workers=1, unique=False, batch_size=None):
+        """
+        Yield n random recipes as plain dicts, as the responses arrive: at most 2 * workers responses are held in memory,
+        so memory stays flat however large n is, and the first meals can be consumed before the last request is sent.
+
+        Parameters
+        ----------
+            n_meals, workers, unique : See get_meals_random.
+
+            batch_size (int) : Number of meals per yielded list, default None (meals are yielded one by one).
+
+        Yields
+        ------
+            dict_meal (dict or list) : Random recipes, or lists of batch_size of them.
+        """
+        yield from _batched(self._random_meals(n_meals, workers=workers, unique=unique), batch_size)
+
+    def _filter_meals(self, filter_type, filter_value, n_meals=None, how='and', details=False, workers=8):
+        """
+        Get the meals of a filter, see get_meals_filter_by.
+
+        Returns
+        -------
+            dict_meals (list or iterator) : Meals basic info, or an iterator of recipes with details=True,
+                                            None if the filter is not valid or matches no meal.
+        """
+        filter_values = [filter_value] if isinstance(filter_value, str) else list(filter_value)
+        filter_types = [filter_type] * len(filter_values) if isinstance(filter_type, str) else list(filter_type)
+        if len(filter_types) != len(filter_values) or not filter_values:
+            logging.error('Please insert one filter type per filter value, or a single filter type for all of them.')
+            return
+        if how not in ['and', 'or']:
+            logging.error("Please insert a valid query type: and or or.")
+            return
+
+        endpoints = [filter_endpoint(t, v) for t, v in zip(filter_types, filter_values)]
+        if None in endpoints:
+            return
+
+        use_mirror = self._use_mirror()
+        if use_mirror:
+            list_results = [self.mirror.filter_meals(t, v) for t, v in zip(filter_types, filter_values)]
+        elif workers <= 1 or len(endpoints) == 1:
+            list_results = [self._get_json(endpoint)['meals'] for endpoint in endpoints]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(endpoints))) as executor:
+                list_results = [dict_response['meals'] for dict_response in executor.map(self._get_json, endpoints)]
+
+        dict_meals = _combine_meals([meals or [] for meals in list_results], how)
+        if not dict_meals:
+            logging.error(f'Could not find any meal with this filter, please retry with another value.')
+            return
+
+        if n_meals:
+            if len(dict_meals) < n_meals: 
+                logging.info(f'Could not find {n_meals} meals with this filter, returning data for only {len(dict_meals)}.')
+            else:
+                logging.info(f'Getting data for {n_meals} meals with the selected filter.')
+            dict_meals = dict_meals[:n_meals]
+        else:
+            logging.info(f'Getting data for {len(dict_meals)} meals with the selected filter.')
+
+        if details:
+            meal_ids = [meal['idMeal'] for meal in dict_meals]
+            if use_mirror:
+                dict_meals = self.mirror.get_meals(meal_ids)
+            else:
+                dict_meals = self._iter_meals((f'/lookup.php?i={meal_id}' for meal_id in meal_ids), workers=workers)
+            
+        return dict_meals
+
+    def _search_meals(self, search_type, search_value):
+        """
+        Get the recipes of a search, see get_meals_search_by.
+
+        Returns
+        -------
+            dict_meals (list) : Recipes matching the search, None if the search is not valid or matches no meal.
+        """
+        endpoint = search_endpoint(search_type, search_value)
+        if endpoint is None:
+            return
         
-        append_meals = []
-        for _ in range(n_meals):
-            response = self._connect_api(random_endpoint)
-            dict_random = response.json()['meals']
-            append_meals = append_meals + dict_random
-
-        df_meals = pd.DataFrame(append_meals)
-        logging.info(f'Getting data for {len(df_meals)} random meals.')
+        if self._use_mirror():
+            dict_meals = self.mirror.search_meals(search_type, search_value)
+        else:
+            dict_meals = self._get_json(endpoint)['meals']
+        if not dict_meals:
+            logging.error(f'Could not find any meal with this search, please retry with another value.')
+            return
+
+        logging.info(f'Getting data for {len(dict_meals)} meals with this search.')
+
+        return dict_meals
+
+    def _random_meals(self, n_meals, workers=1, unique=False):
+        """
+        Get n random recipes, see get_meals_random.
+
+        Returns
+        -------
+            iter_meals (iterator) : Random recipes, requested as they are consumed.
+        """
+        random_endpoint = f'/random.php'
         
-        return self._output_type(df_meals, output_type, csv_path)
\ No newline at end of file
+        logging.info(f'Getting data for {n_meals} random meals.')
+        if unique:
+            return self._iter_unique_random_meals(n_meals, workers=workers)
+        return self._iter_meals([random_endpoint] * n_meals, workers=workers)
+
+    def _iter_unique_random_meals(self, n_meals, workers=1):
+        """
+        Yields n distinct random meals with as few calls as possible: random.php is cheap while its meals rarely repeat,
+        but collecting most of the catalog that way wastes most calls on duplicates (coupon collector problem).
+        After RANDOM_DUPLICATES_BUDGET duplicates, the missing meals are sampled from the listed meal ids instead.
+
+        Yields
+        ------
+            dict_meal (dict) : Distinct random meals recipes.
+        """
+        seen_ids = set()
+        n_duplicates = 0
+
+        def random_endpoints():
+            # Read lazily by _iter_meals, so it stops issuing calls as soon as the consumer has enough meals.
+            n_calls = 0
+            while n_calls < n_meals + n_duplicates and n_duplicates <= RANDOM_DUPLICATES_BUDGET:
+                n_calls += 1
+                yield '/random.php'
+
+        for meal in self._iter_meals(random_endpoints(), workers=workers):
+            if len(seen_ids) == n_meals:
+                continue
+            if meal['idMeal'] in seen_ids:
+                n_duplicates += 1
+                continue
+            seen_ids.add(meal['idMeal'])
+            yield meal
+
+        if len(seen_ids) == n_meals:
+            return
+
+        logging.info(f'random.php returned {n_duplicates} duplicates, sampling the {n_meals - len(seen_ids)} missing meals from the catalog.')
+        meal_ids = self.list_meal_ids(filter_types=('category',), workers=max(workers, 1))
+        if meal_ids is None:
+            return
+        unseen_ids = [meal_id for meal_id in meal_ids if meal_id not in seen_ids]
+        if len(unseen_ids) < n_meals - len(seen_ids):
+            logging.warning(f'The catalog only has {len(meal_ids)} meals, returning all of them.')
+
+        sampled_ids = random.sample(unseen_ids, min(len(unseen_ids), n_meals - len(seen_ids)))
+        yield from self._iter_meals((f'/lookup.php?i={meal_id}' for meal_id in sampled_ids), workers=workers)
+
+    def list_meal_ids(self, filter_types=('category', 'area', 'ingredient'), workers=8):
+        """
+        Get the ids of all the meals reachable through the filter endpoints.
+
+        Parameters
+        ----------
+            filter_types (iterable) : Filter types whose values are all filtered: category, area, ingredient.
+                                      Every meal has a category, the other types only add overlapping calls.
+
+            workers (int) : Maximum number of concurrent filter requests, default 8.
+
+        Returns
+        -------
+            list_meal_ids (list) : Unique idMeal values, in the order they were found.
+        """
+        meal_summaries = self._list_meal_summaries(filter_types=filter_types, workers=workers)
+        if meal_summaries is None:
+            return
+
+        return list(meal_summaries)
+
+    def _list_meal_summaries(self, filter_types=('category',), workers=8):
+        """
+        Get the basic info of all the meals reachable through the filter endpoints.
+
+        Returns
+        -------
+            meal_summaries (dict) : idMeal -> {strMeal, strMealThumb, idMeal}, in the order the meals were found.
+        """
+        filter_endpoints = []
+        for filter_type in filter_types:
+            filter_values = self.list_filter_values(filter_type)
+            if filter_values is None:
+                return
+            filter_endpoints += [filter_endpoint(filter_type, value) for value in filter_values]
+
+        logging.info(f'Filtering meals by {len(filter_endpoints)} values.')
+        meal_summaries = {}
+        for meal in self._iter_meals(filter_endpoints, workers=workers):
+            meal_summaries.setdefault(meal['idMeal'], meal)
+
+        return meal_summaries
+
+    def crawl(self, output_path='./meals.jsonl', checkpoint_path=None, filter_types=('category', 'area', 'ingredient'), workers=8):
+        """
+        Pull the recipes of the whole catalog into a JSON lines file, one meal per line.
+        The meal ids found are checkpointed next to the output, so an interrupted crawl resumes
+        where it stopped instead of restarting: meals already in the output are not pulled again.
+
+        Parameters
+        ----------
+            output_path (str) : Path of the JSON lines file the recipes are appended to, default './meals.jsonl'.
+
+            checkpoint_path (str) : Path of the crawl checkpoint, default output_path + '.checkpoint'.
+                                    It's removed once the crawl completes.
+
+            filter_types (iterable) : Filter types used to find the meal ids: category, area, ingredient.
+
+            workers (int) : Maximum number of concurrent requests, default 8.
+
+        Returns
+        -------
+            n_meals (int) : Number of meals in the output file.
+        """
+        checkpoint_path = checkpoint_path or output_path + '.checkpoint'
+
+        meal_ids = crawler.load_checkpoint(checkpoint_path)
+        if meal_ids is None:
+            meal_ids = self.list_meal_ids(filter_types=filter_types, workers=workers)
+            if meal_ids is None:
+                return
+            crawler.save_checkpoint(checkpoint_path, meal_ids)
+        else:
+            logging.info(f'Resuming crawl from {checkpoint_path}.')
+
+        done_ids = crawler.read_done_ids(output_path)
+        pending_ids = [meal_id for meal_id in meal_ids if meal_id not in done_ids]
+        logging.info(f'Crawling {len(pending_ids)} of {len(meal_ids)} meals, {len(done_ids)} already done.')
+
+        lookup_endpoints = (f'/lookup.php?i={meal_id}' for meal_id in pending_ids)
+        n_meals = len(done_ids)
+        with open(output_path, 'a', encoding='utf-8') as f:
+            for meal in self._iter_meals(lookup_endpoints, workers=workers):
+                f.write(json.dumps(meal) + '\n')
+                n_meals += 1
+                if n_meals % 100 == 0:
+                    f.flush()
+                    logging.info(f'{n_meals}/{len(meal_ids)} meals crawled.')
+
+        crawler.remove_checkpoint(checkpoint_path)
+        logging.info(f'Crawled {n_meals} meals into {output_path}.')
+
+        return n_meals
+
+    def sync(self, output_path='./meals_delta.jsonl', state_path='./meals.sync.json', output_type='jsonl',
+             filter_types=('category',), full=False, workers=8):
+        """
+        Pull only the recipes added or changed since the previous sync into a file, instead of the whole catalog.
+        A state file keeps the hashes of each meal's filter summary and recipe, and its dateModified:
+        only the new meals and the meals whose summary changed are looked up, and only the recipes
+        whose hash or dateModified changed are written to the output.
+
+        Parameters
+        ----------
+            output_path (str) : Path of the file the changed recipes are written to, default './meals_delta.jsonl'.
+
+            state_path (str) : Path of the sync state file, created on the first sync, default './meals.sync.json'.
+
+            output_type (str) : Format of the output file: csv, jsonl or parquet, default jsonl.
+
+            filter_types (iterable) : Filter types used to find the meals, every meal has a category, default ('category',).
+
+            full (bool) : Whether to look up every meal, to catch recipe edits that don't change the filter summary
+                          (name and thumbnail), default False.
+
+            workers (int) : Maximum number of concurrent requests, default 8.
+
+        Returns
+        -------
+            n_meals (int) : Number of new or changed meals written to the output.
+        """
+        if output_type not in writers.OUTPUT_WRITERS:
+            logging.error(f'Please specify a valid output type: csv, jsonl or parquet.')
+            return
+
+        meal_summaries = self._list_meal_summaries(filter_types=filter_types, workers=workers)
+        if meal_summaries is None:
+            return
+
+        state = crawler.load_sync_state(state_path)
+        summary_hashes = {meal_id: crawler.content_hash(summary) for meal_id, summary in meal_summaries.items()}
+        pending_ids = [meal_id for meal_id, summary_hash in summary_hashes.items()
+                       if full or state.get(meal_id, {}).get('summary') != summary_hash]
+        removed_ids = [meal_id for meal_id in state if meal_id not in meal_summaries]
+        logging.info(f'Syncing {len(pending_ids)} of {len(meal_summaries)} meals, {len(removed_ids)} removed since the last sync.')
+
+        def iter_changed_meals():
+            lookup_endpoints = (f'/lookup.php?i={meal_id}' for meal_id in pending_ids)
+            for meal in self._iter_meals(lookup_endpoints, workers=workers):
+                meal_id = meal['idMeal']
+                meal_state = {'summary': summary_hashes.get(meal_id), 'hash': crawler.content_hash(meal),
+                              'dateModified': meal.get('dateModified')}
+                previous_state = state.get(meal_id, {})
+                state[meal_id] = meal_state
+                if (previous_state.get('hash'), previous_state.get('dateModified')) != (meal_state['hash'], meal_state['dateModified']):
+                    yield meal
+
+        n_meals = writers.write_records(iter_changed_meals(), output_type, output_path)
+        for meal_id in removed_ids:
+            del state[meal_id]
+        crawler.save_sync_state(state_path, state)
+        logging.info(f'Synced {n_meals} new or changed meals into {output_path}.')
+
+        return n_meals
+
+    def download_thumbnails(self, meals, output_dir='./thumbnails', workers=8):
+        """
+        Download the strMealThumb images of meals concurrently, each stored once under the hash of its content.
+        Downloads are recorded in output_dir/manifest.jsonl, so re-running on the same meals skips the images already stored.
+        The images are fetched from the CDN with the client's session, outside the API rate limiter and request stats.
+
+        Parameters
+        ----------
+            meals (pandas.DataFrame, list or str) : Meals returned by the client, as a DataFrame, a list of dicts,
+                                                    or the path of a csv, jsonl or parquet file exported by the client.
+
+            output_dir (str) : Directory the images and their manifest are written to, default './thumbnails'.
+
+            workers (int) : Maximum number of concurrent downloads, default 8.
+
+        Returns
+        -------
+            summary (dict) : Number of images downloaded, skipped and failed, bytes downloaded and throughput.
+        """
+        if isinstance(meals, str):
+            meals = thumbnails.read_meal_records(meals)
+            if meals is None:
+                return
+        elif hasattr(meals, 'to_dict'):
+            meals = meals.to_dict('records')
+
+        urls = {}
+        for meal in meals:
+            url = meal.get('strMealThumb')
+            if isinstance(url, str) and url:
+                urls.setdefault(url, str(meal.get('idMeal')))
+        if not urls:
+            logging.error('Could not find any strMealThumb in the meals, please pull them with the filter, search or random commands.')
+            return
+
+        store = thumbnails.ThumbnailStore(output_dir)
+        pending = [(meal_id, url) for url, meal_id in urls.items() if not store.has(url)]
+        logging.info(f'Downloading {len(pending)} thumbnails, {len(urls) - len(pending)} already in {output_dir}.')
+
+        def download(meal_id, url):
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            store.save(meal_id, url, response.content)
+            return len(response.content)
+
+        started_at = time.monotonic()
+        n_bytes, n_failed = 0, 0
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = [executor.submit(download, meal_id, url) for meal_id, url in pending]
+            for future in as_completed(futures):
+                try:
+                    n_bytes += future.result()
+                except (requests.exceptions.RequestException, OSError) as err:
+                    n_failed += 1
+                    logging.warning('Could not download or store a thumbnail.', extra={'error': err})
+        seconds = time.monotonic() - started_at
+
+        summary = {
+            'downloaded': len(pending) - n_failed,
+            'skipped': len(urls) - len(pending),
+            'failed': n_failed,
+            'bytes': n_bytes,
+            'seconds': round(seconds, 3),
+            'images_per_sec': round((len(pending) - n_failed) / seconds, 2) if pending else None,
+            'mb_per_sec': round(n_bytes / 2 ** 20 / seconds, 3) if pending else None
+        }
+        logging.info(f"Downloaded {summary['downloaded']} thumbnails into {output_dir} in {summary['seconds']}s "
+                     f"({summary['images_per_sec']} images/s, {summary['mb_per_sec']} MB/s), {n_failed} failed.")
+
+        return summary
+
+    def sync_mirror(self, filter_types=('category',), workers=8):
+        """
+        Syncs the client's mirror with the whole catalog of the API.
+        The response cache is bypassed, so the mirror is never stamped fresh with outdated cached responses.
+
+        Parameters
+        ----------
+            filter_types (iterable) : Filter types used to find the meal ids, every meal has a category, default ('category',).
+
+            workers (int) : Maximum number of concurrent requests, default 8.
+
+        Returns
+        -------
+            n_meals (int) : Number of meals mirrored.
+        """
+        if self.mirror is None:
+            logging.error('Please initialize the client with a mirror to sync.')
+            return
+
+        client = copy.copy(self)
+        client.cache = None
+        return self.mirror.sync(client, filter_types=filter_types, workers=workers)
+
+    def query_meals(self, ingredients=(), categories=(), areas=(), how='and', output_type='pandas', output_path=None):
+        """
+        Get the recipes of the meals matching several filters from the client's mirror, eg:
+        ingredients=['chicken', 'garlic'], areas=['Italian'] for the Italian meals with chicken and garlic.
+        The API can only filter by one value at a time, so these queries require a synced mirror.
+
+        Parameters
+        ----------
+            ingredients (iterable) : Ingredients to filter by.
+
+            categories (iterable) : Categories to filter by.
+
+            areas (iterable) : Areas to filter by.
+
+            how (str) : 'and' to get the meals matching all the filters, 'or' to get the meals matching any, default 'and'.
+
+            output_type (str) : Format of the data outuput: pandas (pandas.DataFrame), normalized, csv, jsonl or parquet.
+
+            output_path (str) : Absolute path of where the file should be written to, default './output.{output_type}'.
+
+        Returns
+        -------
+            df_meals (pandas.DataFrame) : DataFrame containing the recipes of the matching meals.
+        """
+        if self.mirror is None or self.mirror.synced_at is None:
+            logging.error('Please initialize the client with a synced mirror to query meals.')
+            return
+
+        meal_ids = self.mirror.query_ids(ingredients=ingredients, categories=categories, areas=areas, how=how)
+        if meal_ids is None:
+            return
+        logging.info(f'Getting data for {len(meal_ids)} meals matching the query.')
+
+        return self._output_type(self.mirror.get_meals(meal_ids), output_type, output_path)
\ No newline at end of file
@@ -0,0 +1,212 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+"""A local offline mirror of The Meal DB catalog, with inverted indexes to filter meals without calling the API."""
+
+DEFAULT_MIRROR_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'meal_db', 'mirror.sqlite')
+
+# Recipe keys indexed for each filter type, the ingredient index is built from strIngredient1 - strIngredient20.
+INDEXED_KEYS = {
+    'category': ['strCategory'],
+    'area': ['strArea'],
+    'ingredient': [f'strIngredient{position}' for position in range(1, 21)]
+}
+
+
+def _index_key(value):
+    """
+    Normalizes a filter value the way the API matches it, eg: 'Chicken_Breast ' -> 'chicken breast'.
+    """
+    return value.strip().lower().replace('_', ' ')
+
+
+class MealDBMirror:
+    """
+    Parameters
+    ----------
+        path (str): Path of the SQLite file storing the mirrored recipes, default '~/.cache/meal_db/mirror.sqlite'.
+
+        max_age (float): Seconds since the last sync during which the mirror is considered fresh, default 24 hours.
+
+    """
+    def __init__(self, path=DEFAULT_MIRROR_PATH, max_age=24 * 60 * 60):
+        self.path = path
+        self.max_age = max_age
+        self.synced_at = None
+
+        self._lock = threading.Lock()
+        self._meals = None
+        self._index = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meals (idMeal TEXT PRIMARY KEY, body TEXT NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value REAL NOT NULL)')
+            row = conn.execute("SELECT value FROM sync_state WHERE key = 'synced_at'").fetchone()
+            self.synced_at = row[0] if row else None
+
+    @contextmanager
+    def _connect(self):
+        """
+        Opens a connection to the mirror file, committing on success and closing it on exit.
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def is_fresh(self):
+        """
+        Returns
+        -------
+            is_fresh (bool) : Whether the mirror was synced less than max_age seconds ago.
+        """
+        return self.synced_at is not None and time.time() - self.synced_at <= self.max_age
+
+    def sync(self, client, filter_types=('category',), workers=8):
+        """
+        Replaces the mirrored catalog by the recipes of all the meals currently in the API.
+
+        Parameters
+        ----------
+            client (MealDBClient): Client used to pull the catalog.
+
+            filter_types (iterable): Filter types used to find the meal ids, every meal has a category, default ('category',).
+
+            workers (int): Maximum number of concurrent requests, default 8.
+
+        Returns
+        -------
+            n_meals (int) : Number of meals mirrored.
+        """
+        meal_ids = client.list_meal_ids(filter_types=filter_types, workers=workers)
+        if meal_ids is None:
+            return
+
+        logging.info(f'Mirroring {len(meal_ids)} meals into {self.path}.')
+        lookup_endpoints = (f'/lookup.php?i={meal_id}' for meal_id in meal_ids)
+        meals = {meal['idMeal']: meal for meal in client._iter_meals(lookup_endpoints, workers=workers)}
+
+        synced_at = time.time()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM meals')
+            conn.executemany('INSERT INTO meals (idMeal, body) VALUES (?, ?)',
+                             ((meal_id, json.dumps(meal)) for meal_id, meal in meals.items()))
+            conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('synced_at', ?)", (synced_at,))
+
+        with self._lock:
+            self.synced_at = synced_at
+            self._meals, self._index = meals, self._build_index(meals)
+
+        return len(meals)
+
+    @staticmethod
+    def _build_index(meals):
+        """
+        Builds the inverted indexes from each category, area and ingredient to the set of its idMeal.
+        """
+        index = {filter_type: {} for filter_type in INDEXED_KEYS}
+        for meal_id, meal in meals.items():
+            for filter_type, keys in INDEXED_KEYS.items():
+                for key in keys:
+                    value = meal.get(key)
+                    if value and value.strip():
+                        index[filter_type].setdefault(_index_key(value), set()).add(meal_id)
+        return index
+
+    def _load(self):
+        """
+        Loads the mirrored recipes and builds their indexes on first use.
+        """
+        with self._lock:
+            if self._meals is None:
+                with self._connect() as conn:
+                    rows = conn.execute('SELECT idMeal, body FROM meals').fetchall()
+                self._meals = {meal_id: json.loads(body) for meal_id, body in rows}
+                self._index = self._build_index(self._meals)
+            return self._meals, self._index
+
+    def _match_ids(self, filter_type, filter_value):
+        """
+        Returns
+        -------
+            meal_ids (set) : Ids of the meals where filter_type = filter_value.
+        """
+        _, index = self._load()
+        return index[filter_type].get(_index_key(filter_value), set())
+
+    def query_ids(self, ingredients=(), categories=(), areas=(), how='and'):
+        """
+        Get the ids of the meals matching several filters, combined by set intersection (and) or union (or).
+
+        Parameters
+        ----------
+            ingredients (iterable): Ingredients to filter by, eg: ['chicken', 'garlic'].
+
+            categories (iterable): Categories to filter by, eg: ['Pasta'].
+
+            areas (iterable): Areas to filter by, eg: ['Italian'].
+
+            how (str): 'and' to get the meals matching all the filters, 'or' to get the meals matching any, default 'and'.
+
+        Returns
+        -------
+            meal_ids (list) : Sorted ids of the matching meals.
+        """
+        filters = [('ingredient', ingredients), ('category', categories), ('area', areas)]
+        id_sets = [self._match_ids(filter_type, value) for filter_type, values in filters for value in values]
+        if not id_sets:
+            return []
+
+        if how == 'and':
+            meal_ids = set.intersection(*sorted(id_sets, key=len))
+        elif how == 'or':
+            meal_ids = set.union(*id_sets)
+        else:
+            logging.error("Please insert a valid query type: and or or.")
+            return
+
+        return sorted(meal_ids, key=int)
+
+    def get_meals(self, meal_ids):
+        """
+        Returns
+        -------
+            list_meals (list) : Mirrored recipes of the meal ids, skipping the ids not in the mirror.
+        """
+        meals, _ = self._load()
+        return [meals[meal_id] for meal_id in meal_ids if meal_id in meals]
+
+    def filter_meals(self, filter_type, filter_value):
+        """
+        Answers a filter.php request from the mirror.
+
+        Returns
+        -------
+            list_meals (list) : Meals basic info with keys [strMeal, strMealThumb, idMeal], as returned by the API.
+        """
+        meal_ids = sorted(self._match_ids(filter_type, filter_value), key=int)
+        return [{'strMeal': meal['strMeal'], 'strMealThumb': meal['strMealThumb'], 'idMeal': meal['idMeal']}
+                for meal in self.get_meals(meal_ids)]
+
+    def search_meals(self, search_type, search_value):
+        """
+        Answers a search.php (case-insensitive match on the meal name) or lookup.php request from the mirror.
+
+        Returns
+        -------
+            list_meals (list) : Recipes matching the search.
+        """
+        meals, _ = self._load()
+        if search_type == 'meal_id':
+            return self.get_meals([str(search_value)])
+
+        search_value = search_value.strip().lower()
+        return [meal for meal in meals.values() if search_value in meal['strMeal'].lower()]
@@ -0,0 +1,158 @@
+import threading
+import time
+import logging
+from collections import deque
+
+"""A client-side rate limiter adapting its rate and concurrency to how the API responds."""
+
+
+class TokenBucket:
+    """
+    Parameters
+    ----------
+        rate (float): Tokens added per second, ie: the sustained requests per second.
+
+        capacity (float): Maximum number of tokens, ie: the largest burst of requests, default max(rate, 1).
+
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until the bucket holds one.
+        """
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket and concurrency limit shared by every request of a client, tuned AIMD-style:
+    each successful request additively increases the rate and the concurrency limit, while a 429, a 5xx,
+    a connection error or a latency above latency_threshold multiplies them by decrease_factor (at most once per cooldown).
+
+    Parameters
+    ----------
+        rate (float): Initial requests per second, default 10.
+
+        min_rate (float): Lowest requests per second the limiter backs off to, default 1.
+
+        max_rate (float): Highest requests per second the limiter ramps up to, default 50.
+
+        max_concurrency (int): Highest number of requests in flight at once, default 32.
+
+        increase (float): Requests per second added for every rate worth of successful requests, default 1.
+
+        decrease_factor (float): Multiplier applied to the rate and concurrency limit on congestion, default 0.5.
+
+        latency_threshold (float): Seconds above which a response counts as congestion, default 2.
+
+        cooldown (float): Minimum seconds between two decreases, so a burst of 429s backs off only once, default 1.
+
+    """
+    def __init__(self, rate=10, min_rate=1, max_rate=50, max_concurrency=32, increase=1,
+                 decrease_factor=0.5, latency_threshold=2, cooldown=1):
+        self.min_rate = min(min_rate, max_rate)
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+
+        self.bucket = TokenBucket(rate)
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.n_requests = 0
+        self.n_congested = 0
+
+        self._condition = threading.Condition()
+        self._decreased_at = 0
+        self._started_at = time.monotonic()
+        self._completed_at = deque(maxlen=1000)
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def acquire(self):
+        """
+        Waits for a free concurrency slot and a token before a request.
+        """
+        with self._condition:
+            while self.in_flight >= max(1, int(self.concurrency_limit)):
+                self._condition.wait()
+            self.in_flight += 1
+        self.bucket.acquire()
+
+    def release(self, congested, latency):
+        """
+        Reports the outcome of a request started with acquire().
+
+        Parameters
+        ----------
+            congested (bool): Whether the API throttled or failed the request (429, 5xx or connection error).
+
+            latency (float): Seconds the request took.
+        """
+        now = time.monotonic()
+        congested = congested or latency > self.latency_threshold
+        with self._condition:
+            self.in_flight -= 1
+            self.n_requests += 1
+            self._completed_at.append(now)
+
+            if congested:
+                self.n_congested += 1
+                if now - self._decreased_at >= self.cooldown:
+                    self._decreased_at = now
+                    self.bucket.rate = max(self.min_rate, self.bucket.rate * self.decrease_factor)
+                    self.concurrency_limit = max(1, self.concurrency_limit * self.decrease_factor)
+                    logging.warning(f'API is congested, backing off to {self.bucket.rate:.1f} requests/s '
+                                    f'and {int(self.concurrency_limit)} concurrent requests.')
+            else:
+                self.bucket.rate = min(self.max_rate, self.bucket.rate + self.increase / self.bucket.rate)
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+            self.bucket.capacity = max(self.bucket.rate, 1)
+            self._condition.notify_all()
+
+    def throughput(self, window=10):
+        """
+        Returns
+        -------
+            throughput (float) : Requests completed per second over the last window seconds.
+        """
+        now = time.monotonic()
+        with self._condition:
+            n_completed = sum(1 for completed_at in self._completed_at if now - completed_at <= window)
+        return n_completed / min(window, max(now - self._started_at, 1e-9))
+
+    def stats(self):
+        """
+        Returns
+        -------
+            stats (dict) : Current limits, effective throughput and request counters.
+        """
+        return {
+            'rate': round(self.rate, 2),
+            'concurrency_limit': int(self.concurrency_limit),
+            'in_flight': self.in_flight,
+            'throughput': round(self.throughput(), 2),
+            'requests': self.n_requests,
+            'congested': self.n_congested
+        }
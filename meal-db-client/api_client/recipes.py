@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+"""Compact representations of The Meal DB recipes."""
+
+CATEGORICAL_COLUMNS = ['strCategory', 'strArea']
+
+
+def normalize_meals(df_meals):
+    """
+    Splits wide recipes into a meals frame and a long ingredients frame.
+    The 20 strIngredientN/strMeasureN slots of each meal become rows of the ingredients frame,
+    built with numpy reshapes instead of a loop over the meals, and the empty slots are dropped.
+
+    Parameters
+    ----------
+        df_meals (pandas.DataFrame): Recipes returned by get_meals_search_by or get_meals_random.
+
+    Returns
+    -------
+        df_meals (pandas.DataFrame) : Recipes without the ingredient and measure columns, strCategory and strArea as categoricals.
+
+        df_ingredients (pandas.DataFrame) : One row per meal ingredient.
+            columns: [idMeal, position, ingredient, measure]
+    """
+    ingredient_columns = [column for column in df_meals.columns
+                          if column.startswith('strIngredient') and column[len('strIngredient'):].isdigit()]
+    positions = np.array([int(column[len('strIngredient'):]) for column in ingredient_columns], dtype=np.int8)
+    measure_columns = [f'strMeasure{position}' for position in positions]
+
+    ingredients = df_meals[ingredient_columns].to_numpy(dtype=object).ravel()
+    measures = df_meals.reindex(columns=measure_columns).to_numpy(dtype=object).ravel()
+    df_ingredients = pd.DataFrame({
+        'idMeal': np.repeat(df_meals['idMeal'].to_numpy(dtype=object), len(positions)),
+        'position': np.tile(positions, len(df_meals)),
+        'ingredient': pd.Series(ingredients, dtype=object).str.strip(),
+        'measure': pd.Series(measures, dtype=object).str.strip()
+    })
+    df_ingredients = df_ingredients[df_ingredients.ingredient.fillna('') != ''].reset_index(drop=True)
+
+    df_meals = df_meals.drop(columns=ingredient_columns + [c for c in measure_columns if c in df_meals.columns])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df_meals.columns:
+            df_meals[column] = df_meals[column].astype('category')
+
+    return df_meals, df_ingredients
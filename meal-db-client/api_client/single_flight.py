@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import Future
+
+"""Coalescing of concurrent identical calls, so a burst of threads asking for the same url sends a single request."""
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time: threads asking for a key already in flight
+    wait for that call and get its result (or its exception) instead of calling again.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function):
+        """
+        Calls function, unless a call for the same key is in flight, in which case it waits for that call.
+
+        Parameters
+        ----------
+            key (str): Identifies identical calls, eg: the url requested.
+
+            function (callable): Call without arguments returning the result to share.
+
+        Returns
+        -------
+            result, shared (tuple) : The result of the call, and whether it was shared from another thread's call.
+                                     A shared result is the same object for every thread, it should not be mutated.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+
+        if not is_leader:
+            return future.result(), True
+
+        try:
+            result = function()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
\ No newline at end of file
@@ -0,0 +1,138 @@
+import bisect
+import threading
+
+"""Request-level instrumentation of the Meal DB clients: counters and latency histograms per endpoint."""
+
+# Upper bounds in seconds of the latency histogram buckets, growing by 25% from 1ms to about 2 minutes.
+LATENCY_BUCKETS = [0.001 * 1.25 ** i for i in range(53)]
+
+
+class LatencyHistogram:
+    """
+    Counts latencies into fixed buckets, so percentiles cost constant memory however many requests are sent.
+    """
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.n = 0
+
+    def add(self, latency):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.n += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.n += other.n
+
+    def percentile(self, q):
+        """
+        Returns
+        -------
+            latency (float) : Upper bound in seconds of the bucket holding the q-th percentile, or None without latencies.
+        """
+        if self.n == 0:
+            return None
+        rank = max(1, q / 100 * self.n)
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return LATENCY_BUCKETS[min(i, len(LATENCY_BUCKETS) - 1)]
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.latency = LatencyHistogram()
+
+
+class RequestStats:
+    """
+    Thread-safe counters of the requests sent by a client, per endpoint (list.php, filter.php, lookup.php...).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    @staticmethod
+    def _endpoint_name(endpoint):
+        return endpoint.split('?')[0].lstrip('/')
+
+    def _get(self, endpoint):
+        return self._endpoints.setdefault(self._endpoint_name(endpoint), _EndpointStats())
+
+    def record_request(self, endpoint, latency, n_bytes=0, retries=0, error=False):
+        """
+        Records a request sent to the API.
+
+        Parameters
+        ----------
+            endpoint (str): Endpoint called, eg: '/filter.php?c=Seafood'.
+
+            latency (float): Seconds the request took, including its retries.
+
+            n_bytes (int): Size of the response body.
+
+            retries (int): Number of attempts retried by the session.
+
+            error (bool): Whether the request failed or the API answered with an error status.
+        """
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.requests += 1
+            stats.errors += int(error)
+            stats.retries += retries
+            stats.bytes += n_bytes
+            stats.latency.add(latency)
+
+    def record_cache_hit(self, endpoint):
+        """
+        Records a response served by the cache instead of the API.
+        """
+        with self._lock:
+            self._get(endpoint).cache_hits += 1
+
+    def record_coalesced(self, endpoint):
+        """
+        Records a response shared with a concurrent identical request instead of calling the API again.
+        """
+        with self._lock:
+            self._get(endpoint).coalesced += 1
+
+    @staticmethod
+    def _summarize(stats_list):
+        latency = LatencyHistogram()
+        for stats in stats_list:
+            latency.merge(stats.latency)
+
+        def to_ms(seconds):
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            'requests': sum(stats.requests for stats in stats_list),
+            'errors': sum(stats.errors for stats in stats_list),
+            'retries': sum(stats.retries for stats in stats_list),
+            'bytes': sum(stats.bytes for stats in stats_list),
+            'cache_hits': sum(stats.cache_hits for stats in stats_list),
+            'coalesced': sum(stats.coalesced for stats in stats_list),
+            'latency_ms': {'p50': to_ms(latency.percentile(50)),
+                           'p95': to_ms(latency.percentile(95)),
+                           'p99': to_ms(latency.percentile(99))}
+        }
+
+    def summary(self):
+        """
+        Returns
+        -------
+            summary (dict) : Totals of request count, errors, retries, bytes, cache hits, coalesced requests and latency percentiles in ms,
+                             with the same figures per endpoint under 'endpoints'.
+        """
+        with self._lock:
+            endpoints = dict(self._endpoints)
+            summary = self._summarize(list(endpoints.values()))
+            summary['endpoints'] = {name: self._summarize([stats]) for name, stats in sorted(endpoints.items())}
+        return summary
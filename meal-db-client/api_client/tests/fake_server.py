@@ -0,0 +1,167 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+"""A local stand-in for The Meal DB API, seeded with synthetic recipes, to test and benchmark the clients offline."""
+
+CATEGORIES = ['Beef', 'Breakfast', 'Chicken', 'Dessert', 'Goat', 'Lamb', 'Miscellaneous',
+              'Pasta', 'Pork', 'Seafood', 'Side', 'Starter', 'Vegan', 'Vegetarian']
+AREAS = ['American', 'British', 'Chinese', 'French', 'Greek', 'Indian', 'Italian', 'Japanese', 'Mexican', 'Thai']
+INGREDIENTS = [f'Ingredient {i}' for i in range(1, 101)]
+
+
+def make_meals(n_meals, seed=0):
+    """
+    Generates synthetic recipes with the same keys as the API's lookup.php responses.
+
+    Parameters
+    ----------
+        n_meals (int): Number of recipes to generate.
+
+        seed (int): Seed of the generator, the same seed always generates the same recipes, default 0.
+
+    Returns
+    -------
+        list_meals (list) : Recipes dicts, with idMeal from '52000' on.
+    """
+    rng = random.Random(seed)
+    list_meals = []
+    for i in range(n_meals):
+        meal_id = str(52000 + i)
+        meal = {
+            'idMeal': meal_id,
+            'strMeal': f'Meal {meal_id}',
+            'strDrinkAlternate': None,
+            'strCategory': rng.choice(CATEGORIES),
+            'strArea': rng.choice(AREAS),
+            'strInstructions': ' '.join(['Mix everything and cook it.'] * rng.randint(5, 30)),
+            'strMealThumb': f'https://www.themealdb.com/images/media/meals/{meal_id}.jpg',
+            'strTags': None,
+            'strYoutube': f'https://www.youtube.com/watch?v={meal_id}'
+        }
+        ingredients = rng.sample(INGREDIENTS, rng.randint(5, 20))
+        for position in range(1, 21):
+            has_ingredient = position <= len(ingredients)
+            meal[f'strIngredient{position}'] = ingredients[position - 1] if has_ingredient else ''
+            meal[f'strMeasure{position}'] = f'{rng.randint(1, 500)} g' if has_ingredient else ' '
+        meal.update({'strSource': None, 'strImageSource': None, 'strCreativeCommonsConfirmed': None, 'dateModified': None})
+        list_meals.append(meal)
+    return list_meals
+
+
+def _match(value):
+    return value.strip().lower().replace('_', ' ')
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeMealDBServer:
+    """
+    Serves list.php, filter.php, lookup.php, search.php and random.php from memory, in a background thread:
+
+        with FakeMealDBServer(make_meals(1000), latency=0.01) as server:
+            client = MealDBClient(key='1', api_base_url=server.api_base_url)
+
+    Parameters
+    ----------
+        meals (list): Recipes served by the API, eg: make_meals(1000).
+
+        latency (float): Seconds each response is delayed, to simulate the network, default 0.
+
+    """
+    def __init__(self, meals, latency=0):
+        self.meals = {meal['idMeal']: meal for meal in meals}
+        self.latency = latency
+        self.n_requests = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def api_base_url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/api/json/v1'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, endpoint, query):
+        """
+        Returns
+        -------
+            dict_response (dict) : JSON body of the response to an endpoint, eg: ('filter.php', {'c': 'Beef'}).
+        """
+        meals = self.meals.values()
+        if endpoint == 'list.php':
+            filter_type, = query
+            if filter_type == 'i':
+                return {'meals': [{'idIngredient': str(i), 'strIngredient': name} for i, name in enumerate(INGREDIENTS, 1)]}
+            key = {'c': 'strCategory', 'a': 'strArea'}[filter_type]
+            return {'meals': [{key: value} for value in sorted({meal[key] for meal in meals})]}
+        elif endpoint == 'filter.php':
+            (filter_type, value), = query.items()
+            if filter_type == 'i':
+                match = lambda meal: _match(value) in {_match(meal[f'strIngredient{p}']) for p in range(1, 21)}
+            else:
+                key = {'c': 'strCategory', 'a': 'strArea'}[filter_type]
+                match = lambda meal: _match(meal[key]) == _match(value)
+            found = [{'strMeal': m['strMeal'], 'strMealThumb': m['strMealThumb'], 'idMeal': m['idMeal']} for m in meals if match(m)]
+            return {'meals': found or None}
+        elif endpoint == 'lookup.php':
+            meal = self.meals.get(query['i'])
+            return {'meals': [meal] if meal else None}
+        elif endpoint == 'search.php':
+            found = [meal for meal in meals if query['s'].lower() in meal['strMeal'].lower()]
+            return {'meals': found or None}
+        elif endpoint == 'random.php':
+            with self._lock:
+                meal_id = self._rng.choice(list(self.meals))
+            return {'meals': [self.meals[meal_id]]}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.n_requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                url = urlsplit(self.path)
+                endpoint = url.path.rsplit('/', 1)[-1]
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                try:
+                    dict_response = server.respond(endpoint, query)
+                except (KeyError, ValueError):
+                    dict_response = None
+
+                if dict_response is None:
+                    status, body = 404, b'{"error": "not found"}'
+                else:
+                    status, body = 200, json.dumps(dict_response).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,42 @@
+import unittest
+import asyncio
+import importlib.util
+
+API_KEY='1'
+
+@unittest.skipUnless(importlib.util.find_spec('aiohttp'), 'aiohttp is not installed')
+class TestAsyncMealDBClient(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.calls = []
+
+    def _run(self, test_coroutine):
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+
+        async def lookup(request):
+            self.calls.append(request.path_qs)
+            if len(self.calls) == 1:
+                return web.json_response({'error': 'busy'}, status=503)
+            meal_id = request.query['i']
+            return web.json_response({'meals': [{'idMeal': meal_id}] if meal_id != '0' else None})
+
+        async def run():
+            app = web.Application()
+            app.router.add_get(f'/api/json/v1/{API_KEY}/lookup.php', lookup)
+            async with TestServer(app) as server:
+                await test_coroutine(str(server.make_url('/api/json/v1')))
+
+        self.loop.run_until_complete(run())
+
+    def test_lookup_meals(self):
+        from api_client.async_meal_db import AsyncMealDBClient
+
+        async def test(base_url):
+            async with AsyncMealDBClient(key=API_KEY, api_base_url=base_url, concurrency=5, backoff_factor=0) as client:
+                df_meals = await client.lookup_meals([str(i) for i in range(50)])
+            self.assertEqual(df_meals.idMeal.tolist(), [str(i) for i in range(1, 50)])
+            self.assertEqual(len(self.calls), 51)
+
+        self._run(test)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import unittest
+import os
+import json
+import tempfile
+import api_client.meal_db as meal_db
+from api_client import batch
+from api_client.tests.fake_server import FakeMealDBServer, make_meals
+
+API_KEY='1'
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output_dir = os.path.join(self.tmp_dir.name, 'batch_output')
+
+    def test_read_jobs(self):
+        jobs_path = os.path.join(self.tmp_dir.name, 'jobs.jsonl')
+        with open(jobs_path, 'w') as f:
+            f.write('{"type": "random", "n_meals": 2}\n\n{"type": "search", "search_type": "meal_id", "search_value": "1"}\n')
+        self.assertEqual([job['type'] for job in batch.read_jobs(jobs_path)], ['random', 'search'])
+        self.assertIsNone(batch.read_jobs(os.path.join(self.tmp_dir.name, 'jobs.txt')))
+
+    def test_read_jobs_yaml_not_a_list(self):
+        try:
+            import yaml
+        except ImportError:
+            self.skipTest('pyyaml is not installed')
+        jobs_path = os.path.join(self.tmp_dir.name, 'jobs.yaml')
+        with open(jobs_path, 'w') as f:
+            f.write('type: random\nn_meals: 2\n')
+        with self.assertRaises(ValueError):
+            batch.read_jobs(jobs_path)
+
+    def test_run_batch(self):
+        meals = make_meals(30)
+        jobs = [
+            {'name': 'area', 'type': 'filter', 'filter_type': 'area', 'filter_value': meals[0]['strArea'], 'output_type': 'jsonl'},
+            {'name': 'meal', 'type': 'search', 'search_type': 'meal_id', 'search_value': meals[1]['idMeal']},
+            {'type': 'random', 'n_meals': 5, 'workers': 2},
+            {'name': 'missing', 'type': 'search', 'search_type': 'meal_name', 'search_value': 'Pizza'},
+            {'name': 'invalid', 'type': 'random', 'n_meal': 5},
+            {'name': 'bad_filter', 'type': 'filter', 'filter_type': 'cuisine', 'filter_value': 'Thai'}
+        ]
+        with FakeMealDBServer(meals) as server:
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=server.api_base_url)
+            summary = batch.run_batch(client, jobs, output_dir=self.output_dir, workers=4)
+
+        self.assertEqual((summary['ok'], summary['empty'], summary['failed']), (3, 1, 2))
+        self.assertEqual([result['n_meals'] for result in summary['results'][1:3]], [1, 5])
+        self.assertIn('n_meal', summary['results'][4]['error'])
+        self.assertIn('cuisine', summary['results'][5]['error'])
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'area.jsonl')))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'job_2.csv')))
+        with open(os.path.join(self.output_dir, 'summary.json')) as f:
+            self.assertEqual(json.load(f)['requests']['requests'], server.n_requests)
+
+    def test_run_batch_duplicate_names(self):
+        jobs = [{'name': 'job_1', 'type': 'random'}, {'type': 'random'}]
+        client = meal_db.MealDBClient(key=API_KEY)
+        with self.assertRaises(ValueError):
+            batch.run_batch(client, jobs, output_dir=self.output_dir)
+        self.assertFalse(os.path.exists(self.output_dir))
\ No newline at end of file
@@ -0,0 +1,68 @@
+import unittest
+import tempfile
+import responses
+import api_client.meal_db as meal_db
+from api_client.cache import ResponseCache
+
+BASE_URL='https://www.themealdb.com/api/json/v1'
+API_KEY='1'
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    @responses.activate
+    def test_cached_response_skips_api(self):
+        responses.add(responses.GET,
+                      f'{BASE_URL}/{API_KEY}/filter.php?c=Seafood',
+                      json={'meals': [{'idMeal': '52959', 'strMeal': 'Baked salmon with fennel & tomatoes'}]},
+                      status=200)
+
+        cache = ResponseCache(self.cache_dir.name)
+        client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL, cache=cache)
+        for _ in range(3):
+            df_response = client.get_meals_filter_by(filter_type='category', filter_value='Seafood')
+
+        self.assertEqual(df_response.idMeal.loc[0], '52959')
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(cache.stats(), {'hits': 2, 'misses': 1, 'entries': 1})
+
+    def test_expired_and_uncacheable_responses(self):
+        cache = ResponseCache(self.cache_dir.name, ttls={'lookup.php': 0})
+        cache.set(f'{BASE_URL}/{API_KEY}/lookup.php?i=52772', '{"meals": null}')
+        cache.set(f'{BASE_URL}/{API_KEY}/random.php', '{"meals": null}')
+
+        self.assertIsNone(cache.get(f'{BASE_URL}/{API_KEY}/lookup.php?i=52772'))
+        self.assertIsNone(cache.get(f'{BASE_URL}/{API_KEY}/random.php'))
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_least_recently_used_eviction(self):
+        cache = ResponseCache(self.cache_dir.name, max_entries=2)
+        urls = [f'{BASE_URL}/{API_KEY}/filter.php?a={area}' for area in ['French', 'Italian', 'Greek']]
+        cache.set(urls[0], '{}')
+        cache.set(urls[1], '{}')
+        cache.get(urls[0])
+        cache.set(urls[2], '{}')
+
+        self.assertEqual(cache.get(urls[0]), '{}')
+        self.assertIsNone(cache.get(urls[1]))
+        self.assertEqual(cache.get(urls[2]), '{}')
+
+    def test_cache_hits_do_not_write(self):
+        cache = ResponseCache(self.cache_dir.name, max_entries=3)
+        urls = [f'{BASE_URL}/{API_KEY}/lookup.php?i={meal_id}' for meal_id in range(52770, 52775)]
+        for url in urls[:3]:
+            cache.set(url, '{}')
+
+        total_changes = cache._conn.total_changes
+        for _ in range(10):
+            cache.get(urls[0])
+        self.assertEqual(cache._conn.total_changes, total_changes)
+
+        cache.set(urls[3], '{}')
+        cache.set(urls[4], '{}')
+        self.assertEqual(cache.get(urls[0]), '{}')
+        self.assertIsNone(cache.get(urls[1]))
+        self.assertIsNone(cache.get(urls[2]))
+        self.assertEqual(cache.stats()['entries'], 3)
\ No newline at end of file
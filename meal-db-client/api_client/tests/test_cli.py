@@ -0,0 +1,50 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import responses
+from click.testing import CliRunner
+from api_client import cli
+
+BASE_URL='https://www.themealdb.com/api/json/v1'
+API_KEY='1'
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class TestCLIStartup(unittest.TestCase):
+    def test_import_does_not_load_pandas(self):
+        # The startup time itself is measured by benchmarks/bench_cli_startup.py.
+        code = "import sys; import api_client.cli; print('pandas' in sys.modules)"
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT_DIR, universal_newlines=True)
+
+        self.assertEqual(output.strip(), 'False')
+
+class TestCLIFilter(unittest.TestCase):
+    @responses.activate
+    def test_filter_prompts_for_missing_options(self):
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/filter.php?c=Breakfast',
+                      json={'meals': [{'strMeal': 'English Breakfast', 'strMealThumb': 'breakfast.jpg', 'idMeal': '52895'}]})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            key_config = os.path.join(tmp_dir, 'config.json')
+            with open(key_config, 'w') as f:
+                json.dump({'api_key': API_KEY}, f)
+            output_path = os.path.join(tmp_dir, 'output.jsonl')
+
+            result = CliRunner().invoke(cli.cli, ['filter', '-k', key_config, '--no-cache', '-o', 'jsonl', '-p', output_path],
+                                        input='category\nBreakfast\n')
+            with open(output_path) as f:
+                meal_ids = [json.loads(line)['idMeal'] for line in f]
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(meal_ids, ['52895'])
+
+class TestCLIBatch(unittest.TestCase):
+    def test_batch_missing_jobs_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = CliRunner().invoke(cli.cli, ['batch', '-k', os.path.join(tmp_dir, 'config.json'),
+                                                  '-j', os.path.join(tmp_dir, 'jobs.jsonl')])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('Could not read the jobs', result.output)
+        self.assertNotIsInstance(result.exception, FileNotFoundError)
\ No newline at end of file
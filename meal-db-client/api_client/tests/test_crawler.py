@@ -0,0 +1,99 @@
+import unittest
+import os
+import json
+import tempfile
+import responses
+import api_client.meal_db as meal_db
+from api_client import crawler
+
+BASE_URL='https://www.themealdb.com/api/json/v1'
+API_KEY='1'
+
+class TestCrawl(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output_path = os.path.join(self.tmp_dir.name, 'meals.jsonl')
+
+        responses.start()
+        self.addCleanup(responses.stop)
+        self.addCleanup(responses.reset)
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/list.php?c=list',
+                      json={'meals': [{'strCategory': 'Beef'}, {'strCategory': 'Pasta'}]})
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/filter.php?c=Beef',
+                      json={'meals': [{'idMeal': '1'}, {'idMeal': '2'}]})
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/filter.php?c=Pasta',
+                      json={'meals': [{'idMeal': '2'}, {'idMeal': '3'}]})
+        for meal_id in ['1', '2', '3']:
+            responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/lookup.php?i={meal_id}',
+                          json={'meals': [{'idMeal': meal_id, 'strMeal': f'Meal {meal_id}'}]})
+
+    def _lookup_calls(self):
+        return [call.request.url for call in responses.calls if 'lookup.php' in call.request.url]
+
+    def test_crawl_dedupes_meal_ids(self):
+        client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+        n_meals = client.crawl(output_path=self.output_path, filter_types=['category'], workers=4)
+
+        with open(self.output_path) as f:
+            meal_ids = [json.loads(line)['idMeal'] for line in f]
+        self.assertEqual(n_meals, 3)
+        self.assertEqual(sorted(meal_ids), ['1', '2', '3'])
+        self.assertEqual(len(self._lookup_calls()), 3)
+        self.assertFalse(os.path.exists(self.output_path + '.checkpoint'))
+
+    def test_crawl_resumes_from_checkpoint(self):
+        crawler.save_checkpoint(self.output_path + '.checkpoint', ['1', '2', '3'])
+        with open(self.output_path, 'w') as f:
+            f.write(json.dumps({'idMeal': '1'}) + '\n' + '{"idMeal": "2", "strM')
+
+        client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+        n_meals = client.crawl(output_path=self.output_path, filter_types=['category'])
+
+        with open(self.output_path) as f:
+            meal_ids = [json.loads(line)['idMeal'] for line in f]
+        self.assertEqual(n_meals, 3)
+        self.assertEqual(meal_ids, ['1', '2', '3'])
+        self.assertEqual(len(self._lookup_calls()), 2)
+        self.assertFalse(any('filter.php' in call.request.url for call in responses.calls))
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output_path = os.path.join(self.tmp_dir.name, 'delta.jsonl')
+        self.state_path = os.path.join(self.tmp_dir.name, 'meals.sync.json')
+
+    def _sync(self, summaries, meals, full=False):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, f'{BASE_URL}/{API_KEY}/list.php?c=list', json={'meals': [{'strCategory': 'Beef'}]})
+            mock.add(responses.GET, f'{BASE_URL}/{API_KEY}/filter.php?c=Beef', json={'meals': summaries})
+            for meal in meals:
+                mock.add(responses.GET, f'{BASE_URL}/{API_KEY}/lookup.php?i={meal["idMeal"]}', json={'meals': [meal]})
+            mock.assert_all_requests_are_fired = False
+
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+            n_meals = client.sync(output_path=self.output_path, state_path=self.state_path, full=full, workers=2)
+            lookups = sorted(call.request.url.rsplit('=', 1)[-1] for call in mock.calls if 'lookup.php' in call.request.url)
+
+        with open(self.output_path) as f:
+            written_ids = [json.loads(line)['idMeal'] for line in f]
+        return n_meals, lookups, written_ids
+
+    def test_sync_writes_only_the_delta(self):
+        summaries = [{'idMeal': '1', 'strMeal': 'Stew'}, {'idMeal': '2', 'strMeal': 'Pie'}]
+        meals = [{'idMeal': '1', 'strMeal': 'Stew', 'dateModified': None}, {'idMeal': '2', 'strMeal': 'Pie', 'dateModified': None}]
+        self.assertEqual(self._sync(summaries, meals), (2, ['1', '2'], ['1', '2']))
+
+        # Unchanged catalog: no lookups.
+        self.assertEqual(self._sync(summaries, meals), (0, [], []))
+
+        # A renamed meal and a new meal are looked up, a removed meal leaves the state.
+        summaries = [{'idMeal': '1', 'strMeal': 'Beef Stew'}, {'idMeal': '3', 'strMeal': 'Tart'}]
+        meals = [{'idMeal': '1', 'strMeal': 'Beef Stew', 'dateModified': None}, {'idMeal': '3', 'strMeal': 'Tart', 'dateModified': None}]
+        self.assertEqual(self._sync(summaries, meals), (2, ['1', '3'], ['1', '3']))
+        self.assertEqual(sorted(crawler.load_sync_state(self.state_path)), ['1', '3'])
+
+        # A full sync looks up every meal but only writes the edited recipe.
+        meals[1] = {'idMeal': '3', 'strMeal': 'Tart', 'dateModified': '2026-01-01 10:00:00'}
+        self.assertEqual(self._sync(summaries, meals, full=True), (1, ['1', '3'], ['3']))
\ No newline at end of file
@@ -1,9 +1,13 @@
 import unittest
+import os
+import json
+import tempfile
 import api_client.meal_db as meal_db
 import pandas as pd 
 import requests
 from requests.exceptions import ConnectionError
 import responses
+from api_client.tests.fake_server import FakeMealDBServer, make_meals
 
 BASE_URL='https://www.themealdb.com/api/json/v1'
 API_KEY='1'
@@ -47,4 +51,124 @@ class TestMealDBClient(unittest.TestCase):
         client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
         df_response = client.get_meals_random(n_meals=5, output_type='pandas')
         response = len(df_response)
-        self.assertEqual(response, expected)
\ No newline at end of file
+        self.assertEqual(response, expected)
+
+class TestMealDBClientOffline(unittest.TestCase):
+    @responses.activate
+    def test_get_meals_random_workers(self):
+        responses.add(responses.GET,
+                      f'{BASE_URL}/{API_KEY}/random.php',
+                      json={'meals': [{'idMeal': '52772', 'strMeal': 'Teriyaki Chicken Casserole'}]},
+                      status=200)
+
+        client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+        df_response = client.get_meals_random(n_meals=20, workers=4, output_type='pandas')
+        self.assertEqual(len(df_response), 20)
+        self.assertEqual(len(responses.calls), 20)
+
+    @responses.activate
+    def test_connect_api_retries_server_errors(self):
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/random.php', json={'error': 'busy'}, status=503)
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/random.php', json={'meals': [{'idMeal': '52772'}]}, status=200)
+
+        client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL, backoff_factor=0)
+        client_response = client._connect_api('/random.php')
+        self.assertEqual(client_response.status_code, 200)
+        self.assertEqual(len(responses.calls), 2)
+
+    def test_clients_share_session(self):
+        session = meal_db.create_session(pool_size=4)
+        client_a = meal_db.MealDBClient(key=API_KEY, session=session)
+        client_b = meal_db.MealDBClient(key=API_KEY, session=session)
+        self.assertIs(client_a.session, client_b.session)
+
+    @responses.activate
+    def test_get_meals_random_jsonl_output(self):
+        responses.add(responses.GET,
+                      f'{BASE_URL}/{API_KEY}/random.php',
+                      json={'meals': [{'idMeal': '52772', 'strMeal': 'Teriyaki Chicken Casserole'}]},
+                      status=200)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, 'random.jsonl')
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+            client.get_meals_random(n_meals=10, workers=2, output_type='jsonl', output_path=output_path)
+            with open(output_path) as f:
+                self.assertEqual(len(f.readlines()), 10)
+
+            # Positional arguments keep their order from before the workers parameter was added.
+            csv_path = os.path.join(tmp_dir, 'random.csv')
+            client.get_meals_random(3, 'csv', csv_path)
+            with open(csv_path) as f:
+                self.assertEqual(len(f.readlines()), 4)
+
+    def test_fake_server_end_to_end(self):
+        meals = make_meals(50)
+        with FakeMealDBServer(meals) as server:
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=server.api_base_url)
+            df_filter = client.get_meals_filter_by(filter_type='area', filter_value=meals[0]['strArea'])
+            df_search = client.get_meals_search_by(search_type='meal_id', search_value=meals[0]['idMeal'])
+            df_random = client.get_meals_random(n_meals=10, workers=4)
+
+        self.assertIn(meals[0]['idMeal'], df_filter.idMeal.tolist())
+        self.assertEqual(df_search.strMeal.loc[0], meals[0]['strMeal'])
+        self.assertEqual(len(df_random), 10)
+        self.assertEqual(server.n_requests, 12)
+
+    def test_get_meals_filter_by_several_filters(self):
+        meals = make_meals(200)
+        with FakeMealDBServer(meals) as server:
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=server.api_base_url)
+            filters = dict(filter_type=['ingredient', 'area'], filter_value=['Ingredient 1', 'Italian'], output_type='jsonl')
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                output_path = os.path.join(tmp_dir, 'and.jsonl')
+                client.get_meals_filter_by(**filters, output_path=output_path)
+                with open(output_path) as f:
+                    and_ids = [json.loads(line)['idMeal'] for line in f]
+            df_or = client.get_meals_filter_by(filter_type='area', filter_value=['Italian', 'Thai'], how='or')
+            df_details = client.get_meals_filter_by(**dict(filters, output_type='pandas'), details=True, workers=4)
+
+        expected_and = [m['idMeal'] for m in meals if m['strArea'] == 'Italian' and 'Ingredient 1' in m.values()]
+        self.assertEqual(sorted(and_ids), sorted(expected_and))
+        self.assertEqual(sorted(df_or.idMeal), sorted(m['idMeal'] for m in meals if m['strArea'] in ['Italian', 'Thai']))
+        self.assertEqual(sorted(df_details.idMeal), sorted(expected_and))
+        self.assertTrue((df_details.strArea == 'Italian').all())
+
+    def test_endpoints_quote_values(self):
+        self.assertEqual(meal_db.filter_endpoint('ingredient', 'Chicken & Rice'), '/filter.php?i=Chicken%20%26%20Rice')
+        self.assertEqual(meal_db.search_endpoint('meal_name', 'a+b#'), '/search.php?s=a%2Bb%23')
+        self.assertEqual(meal_db.search_endpoint('meal_id', 52772), '/lookup.php?i=52772')
+
+    def test_get_meals_random_unique(self):
+        meals = make_meals(40)
+        with FakeMealDBServer(meals) as server:
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=server.api_base_url)
+            df_few = client.get_meals_random(n_meals=3, workers=2, unique=True)
+            n_requests_few = server.n_requests
+            df_all = client.get_meals_random(n_meals=50, workers=4, unique=True)
+
+        self.assertEqual(df_few.idMeal.nunique(), 3)
+        self.assertLess(n_requests_few, 3 + 2 * 2 + meal_db.RANDOM_DUPLICATES_BUDGET)
+        self.assertEqual(sorted(df_all.idMeal), sorted(meal['idMeal'] for meal in meals))
+        # Without sampling, collecting all 40 meals from random.php would take about 170 calls.
+        self.assertLess(server.n_requests - n_requests_few, 120)
+
+    def test_iter_meals(self):
+        meals = make_meals(50)
+        with FakeMealDBServer(meals) as server:
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=server.api_base_url)
+            iter_random = client.iter_meals_random(n_meals=100, workers=2)
+            first_meal = next(iter_random)
+            n_requests_first = server.n_requests
+            n_random = 1 + sum(1 for _ in iter_random)
+
+            batches = list(client.iter_meals_filter_by(filter_type='area', filter_value=meals[0]['strArea'], details=True, batch_size=4))
+            invalid = list(client.iter_meals_search_by(search_type='meal_area', search_value='Italian'))
+
+        self.assertIn('strInstructions', first_meal)
+        self.assertLessEqual(n_requests_first, 2 * 2 + 1)
+        self.assertEqual(n_random, 100)
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertEqual(sorted(meal['idMeal'] for batch in batches for meal in batch),
+                         sorted(meal['idMeal'] for meal in meals if meal['strArea'] == meals[0]['strArea']))
+        self.assertEqual(invalid, [])
\ No newline at end of file
@@ -0,0 +1,68 @@
+import unittest
+import os
+import tempfile
+import responses
+import api_client.meal_db as meal_db
+from api_client.mirror import MealDBMirror
+from api_client.cache import ResponseCache
+
+BASE_URL='https://www.themealdb.com/api/json/v1'
+API_KEY='1'
+
+MEALS = [
+    {'idMeal': '52795', 'strMeal': 'Chicken Handi', 'strCategory': 'Chicken', 'strArea': 'Indian',
+     'strMealThumb': 'handi.jpg', 'strIngredient1': 'Chicken', 'strIngredient2': 'Garlic', 'strIngredient3': ''},
+    {'idMeal': '52806', 'strMeal': 'Tandoori chicken', 'strCategory': 'Chicken', 'strArea': 'Indian',
+     'strMealThumb': 'tandoori.jpg', 'strIngredient1': 'Chicken', 'strIngredient2': 'Lemons', 'strIngredient3': None},
+    {'idMeal': '52982', 'strMeal': 'Spaghetti alla Carbonara', 'strCategory': 'Pasta', 'strArea': 'Italian',
+     'strMealThumb': 'carbonara.jpg', 'strIngredient1': 'Spaghetti', 'strIngredient2': 'Garlic', 'strIngredient3': None}
+]
+
+class TestMealDBMirror(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.mirror_path = os.path.join(tmp_dir.name, 'mirror.sqlite')
+        self.assertEqual(self._sync(meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL, mirror=MealDBMirror(self.mirror_path))), 3)
+
+    def _sync(self, client):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, f'{BASE_URL}/{API_KEY}/list.php?c=list',
+                     json={'meals': [{'strCategory': 'Chicken'}, {'strCategory': 'Pasta'}]})
+            for category in ['Chicken', 'Pasta']:
+                mock.add(responses.GET, f'{BASE_URL}/{API_KEY}/filter.php?c={category}',
+                         json={'meals': [{'idMeal': m['idMeal']} for m in MEALS if m['strCategory'] == category]})
+            for meal in MEALS:
+                mock.add(responses.GET, f'{BASE_URL}/{API_KEY}/lookup.php?i={meal["idMeal"]}', json={'meals': [meal]})
+            return client.sync_mirror(workers=2)
+
+    def test_sync_bypasses_cache(self):
+        cache = ResponseCache(os.path.join(self.tmp_dir, 'cache'))
+        cache.set(f'{BASE_URL}/{API_KEY}/lookup.php?i=52795', '{"meals": [{"idMeal": "52795", "strMeal": "Old name"}]}')
+        mirror = MealDBMirror(self.mirror_path)
+        self._sync(meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL, cache=cache, mirror=mirror))
+
+        self.assertEqual(mirror.get_meals(['52795'])[0]['strMeal'], 'Chicken Handi')
+        self.assertEqual(cache.stats()['hits'], 0)
+
+    @responses.activate
+    def test_filter_and_search_answered_locally(self):
+        client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL, mirror=MealDBMirror(self.mirror_path))
+        df_filter = client.get_meals_filter_by(filter_type='ingredient', filter_value='garlic')
+        df_search = client.get_meals_search_by(search_type='meal_name', search_value='chicken')
+
+        self.assertEqual(df_filter.columns.tolist(), ['strMeal', 'strMealThumb', 'idMeal'])
+        self.assertEqual(df_filter.idMeal.tolist(), ['52795', '52982'])
+        self.assertEqual(df_search.idMeal.tolist(), ['52795', '52806'])
+        self.assertEqual(len(responses.calls), 0)
+
+    def test_query_ids(self):
+        mirror = MealDBMirror(self.mirror_path)
+        self.assertEqual(mirror.query_ids(ingredients=['chicken', 'garlic']), ['52795'])
+        self.assertEqual(mirror.query_ids(ingredients=['Lemons'], areas=['Italian'], how='or'), ['52806', '52982'])
+        self.assertEqual(mirror.query_ids(ingredients=['garlic'], categories=['Seafood']), [])
+
+    def test_outdated_mirror_not_used(self):
+        mirror = MealDBMirror(self.mirror_path, max_age=0)
+        self.assertFalse(mirror.is_fresh())
\ No newline at end of file
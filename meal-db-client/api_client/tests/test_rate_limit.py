@@ -0,0 +1,37 @@
+import unittest
+import time
+import responses
+import api_client.meal_db as meal_db
+from api_client.rate_limit import TokenBucket, AdaptiveRateLimiter
+
+BASE_URL='https://www.themealdb.com/api/json/v1'
+API_KEY='1'
+
+class TestRateLimit(unittest.TestCase):
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        started_at = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.09)
+
+    def test_aimd_limits(self):
+        limiter = AdaptiveRateLimiter(rate=10, max_rate=20, max_concurrency=8, latency_threshold=1)
+        for congested, latency in [(False, 0.1), (True, 0.1), (True, 0.1), (False, 5)]:
+            limiter.acquire()
+            limiter.release(congested, latency)
+
+        stats = limiter.stats()
+        self.assertAlmostEqual(stats['rate'], 5.05)
+        self.assertEqual(stats['concurrency_limit'], 4)
+        self.assertEqual((stats['requests'], stats['congested'], stats['in_flight']), (4, 3, 0))
+
+    @responses.activate
+    def test_client_reports_throttled_requests(self):
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/random.php', json={}, status=429)
+
+        limiter = AdaptiveRateLimiter(rate=10)
+        client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL, max_retries=0, rate_limiter=limiter)
+        client._connect_api('/random.php')
+        self.assertEqual(limiter.stats()['congested'], 1)
+        self.assertEqual(limiter.rate, 5)
\ No newline at end of file
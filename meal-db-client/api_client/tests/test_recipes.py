@@ -0,0 +1,27 @@
+import unittest
+import pandas as pd
+from api_client import recipes
+
+def _meal(meal_id, ingredients):
+    meal = {'idMeal': meal_id, 'strMeal': f'Meal {meal_id}', 'strCategory': 'Pasta', 'strArea': 'Italian'}
+    for position in range(1, 21):
+        ingredient, measure = ingredients[position - 1] if position <= len(ingredients) else ('', ' ')
+        meal[f'strIngredient{position}'] = ingredient
+        meal[f'strMeasure{position}'] = measure
+    return meal
+
+class TestNormalizeMeals(unittest.TestCase):
+    def test_normalize_meals(self):
+        df_wide = pd.DataFrame([
+            _meal('52982', [('Spaghetti', '1 lb'), ('Egg Yolks', '4 '), ('Parmesan', None)]),
+            _meal('52771', [('penne rigate', '1 pound'), (None, None), ('olive oil', '1/4 cup')])
+        ])
+        df_meals, df_ingredients = recipes.normalize_meals(df_wide)
+
+        self.assertEqual(df_meals.columns.tolist(), ['idMeal', 'strMeal', 'strCategory', 'strArea'])
+        self.assertEqual(df_meals.strCategory.dtype.name, 'category')
+        self.assertEqual(df_ingredients.columns.tolist(), ['idMeal', 'position', 'ingredient', 'measure'])
+        self.assertEqual(df_ingredients.idMeal.tolist(), ['52982', '52982', '52982', '52771', '52771'])
+        self.assertEqual(df_ingredients.position.tolist(), [1, 2, 3, 1, 3])
+        self.assertEqual(df_ingredients.measure.tolist()[:2], ['1 lb', '4'])
+        self.assertTrue(pd.isna(df_ingredients.measure.loc[2]))
\ No newline at end of file
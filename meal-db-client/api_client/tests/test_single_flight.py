@@ -0,0 +1,59 @@
+import unittest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import api_client.meal_db as meal_db
+from api_client.single_flight import SingleFlight
+from api_client.tests.fake_server import FakeMealDBServer, make_meals
+
+API_KEY='1'
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_are_coalesced(self):
+        single_flight = SingleFlight()
+        n_calls = []
+
+        def slow_call():
+            n_calls.append(1)
+            time.sleep(0.2)
+            return {'meals': []}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: single_flight.do('/filter.php?c=Beef', slow_call), range(8)))
+
+        self.assertEqual(len(n_calls), 1)
+        self.assertEqual(sum(shared for _, shared in results), 7)
+        self.assertTrue(all(result is results[0][0] for result, _ in results))
+
+    def test_exceptions_are_shared(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+
+        def failing_call():
+            started.set()
+            time.sleep(0.2)
+            raise ValueError('API down')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(single_flight.do, 'key', failing_call)
+            started.wait()
+            follower = executor.submit(single_flight.do, 'key', failing_call)
+            for future in [leader, follower]:
+                self.assertRaises(ValueError, future.result)
+
+        # The key is released once the call completes.
+        self.assertEqual(single_flight.do('key', lambda: 1), (1, False))
+
+    def test_client_coalesces_lookups_but_not_random(self):
+        meals = make_meals(10)
+        with FakeMealDBServer(meals, latency=0.2) as server:
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=server.api_base_url)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: client._get_json(f"/lookup.php?i={meals[0]['idMeal']}"), range(8)))
+            n_lookups = server.n_requests
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: client._get_json('/random.php'), range(8)))
+
+        self.assertEqual(n_lookups, 1)
+        self.assertEqual(server.n_requests, 9)
+        self.assertEqual(client.stats.summary()['coalesced'], 7)
\ No newline at end of file
@@ -0,0 +1,46 @@
+import unittest
+import responses
+import api_client.meal_db as meal_db
+from api_client.cache import ResponseCache
+from api_client.stats import LatencyHistogram, RequestStats
+import tempfile
+
+BASE_URL='https://www.themealdb.com/api/json/v1'
+API_KEY='1'
+
+class TestRequestStats(unittest.TestCase):
+    def test_latency_percentiles(self):
+        histogram = LatencyHistogram()
+        for latency in [0.01] * 90 + [1] * 10:
+            histogram.add(latency)
+        self.assertLess(histogram.percentile(50), 0.0125)
+        self.assertGreaterEqual(histogram.percentile(99), 1)
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+    def test_summary_per_endpoint(self):
+        stats = RequestStats()
+        stats.record_request('/filter.php?c=Beef', 0.1, n_bytes=100)
+        stats.record_request('/filter.php?c=Pasta', 0.2, n_bytes=50, retries=2, error=True)
+        stats.record_cache_hit('/lookup.php?i=52772')
+
+        summary = stats.summary()
+        self.assertEqual((summary['requests'], summary['errors'], summary['retries'], summary['bytes'], summary['cache_hits']),
+                         (2, 1, 2, 150, 1))
+        self.assertEqual(sorted(summary['endpoints']), ['filter.php', 'lookup.php'])
+        self.assertEqual(summary['endpoints']['filter.php']['requests'], 2)
+        self.assertIsNone(summary['endpoints']['lookup.php']['latency_ms']['p50'])
+
+    @responses.activate
+    def test_client_records_requests_and_cache_hits(self):
+        responses.add(responses.GET, f'{BASE_URL}/{API_KEY}/list.php?c=list', json={'meals': [{'strCategory': 'Beef'}]})
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL, cache=ResponseCache(cache_dir))
+            client.list_filter_values('category')
+            client.list_filter_values('category')
+            client.cache.close()
+
+        summary = client.stats.summary()
+        self.assertEqual((summary['requests'], summary['cache_hits']), (1, 1))
+        self.assertGreater(summary['bytes'], 0)
+        self.assertIsNotNone(summary['latency_ms']['p95'])
\ No newline at end of file
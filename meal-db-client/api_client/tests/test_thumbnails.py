@@ -0,0 +1,71 @@
+import unittest
+import os
+import json
+import hashlib
+import tempfile
+from unittest import mock as unittest_mock
+import responses
+import api_client.meal_db as meal_db
+from api_client import writers
+
+BASE_URL='https://www.themealdb.com/api/json/v1'
+API_KEY='1'
+THUMB_URL='https://www.themealdb.com/images/media/meals'
+
+class TestThumbnails(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output_dir = os.path.join(self.tmp_dir.name, 'thumbnails')
+        self.meals = [{'idMeal': str(i), 'strMeal': f'Meal {i}', 'strMealThumb': f'{THUMB_URL}/{i}.jpg'} for i in range(1, 5)]
+        # Meals 3 and 4 share the same image.
+        self.images = {'1': b'one', '2': b'two', '3': b'same', '4': b'same'}
+
+    def _add_images(self, mock):
+        for meal_id, image in self.images.items():
+            mock.add(responses.GET, f'{THUMB_URL}/{meal_id}.jpg', body=image, content_type='image/jpeg')
+
+    def test_download_thumbnails_from_csv(self):
+        csv_path = os.path.join(self.tmp_dir.name, 'meals.csv')
+        writers.write_records(self.meals, 'csv', csv_path)
+
+        with responses.RequestsMock() as mock:
+            self._add_images(mock)
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+            summary = client.download_thumbnails(csv_path, output_dir=self.output_dir, workers=4)
+
+        expected_files = {hashlib.sha256(image).hexdigest() + '.jpg' for image in self.images.values()}
+        self.assertEqual((summary['downloaded'], summary['skipped'], summary['failed']), (4, 0, 0))
+        self.assertEqual(set(os.listdir(self.output_dir)), expected_files | {'manifest.jsonl'})
+        self.assertEqual(client.stats.summary()['requests'], 0)
+
+        with open(os.path.join(self.output_dir, 'manifest.jsonl')) as f:
+            self.assertEqual(sorted(json.loads(line)['idMeal'] for line in f), ['1', '2', '3', '4'])
+
+    def test_download_thumbnails_skips_existing(self):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as mock:
+            self._add_images(mock)
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+            client.download_thumbnails(self.meals[:2], output_dir=self.output_dir)
+
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as mock:
+            self._add_images(mock)
+            summary = client.download_thumbnails(self.meals, output_dir=self.output_dir)
+            self.assertEqual(len(mock.calls), 2)
+        self.assertEqual((summary['downloaded'], summary['skipped']), (2, 2))
+
+    def test_download_thumbnails_counts_storage_errors(self):
+        save = meal_db.thumbnails.ThumbnailStore.save
+
+        def save_or_fail(store, meal_id, url, content):
+            if meal_id == '2':
+                raise OSError('No space left on device')
+            return save(store, meal_id, url, content)
+
+        with responses.RequestsMock() as mock, \
+                unittest_mock.patch.object(meal_db.thumbnails.ThumbnailStore, 'save', save_or_fail):
+            self._add_images(mock)
+            client = meal_db.MealDBClient(key=API_KEY, api_base_url=BASE_URL)
+            summary = client.download_thumbnails(self.meals, output_dir=self.output_dir, workers=2)
+
+        self.assertEqual((summary['downloaded'], summary['failed']), (3, 1))
\ No newline at end of file
@@ -0,0 +1,39 @@
+import unittest
+import os
+import json
+import tempfile
+import importlib.util
+import pandas as pd
+from api_client import writers
+
+RECORDS = [{'idMeal': str(52770 + i), 'strMeal': f'Meal {i}', 'strDrinkAlternate': None} for i in range(7)]
+
+class TestWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_csv_chunks_match_dataframe_to_csv(self):
+        n_records = writers.write_records(iter(RECORDS), 'csv', self._path('meals.csv'), chunk_size=3)
+        pd.DataFrame(RECORDS).to_csv(self._path('expected.csv'))
+
+        with open(self._path('meals.csv')) as f, open(self._path('expected.csv')) as expected:
+            self.assertEqual(f.read(), expected.read())
+        self.assertEqual(n_records, 7)
+
+    def test_jsonl_chunks(self):
+        writers.write_records(iter(RECORDS), 'jsonl', self._path('meals.jsonl'), chunk_size=3)
+
+        with open(self._path('meals.jsonl')) as f:
+            self.assertEqual([json.loads(line) for line in f], RECORDS)
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_parquet_chunks(self):
+        writers.write_records(iter(RECORDS), 'parquet', self._path('meals.parquet'), chunk_size=3)
+
+        df = pd.read_parquet(self._path('meals.parquet'))
+        self.assertEqual(df.idMeal.tolist(), [record['idMeal'] for record in RECORDS])
+        self.assertTrue(df.strDrinkAlternate.isna().all())
\ No newline at end of file
@@ -0,0 +1,107 @@
+import os
+import csv
+import json
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit
+
+"""Content-addressed storage of the meals thumbnails, with a manifest so re-runs skip the images already downloaded."""
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+
+def read_meal_records(path):
+    """
+    Reads the meals records of a file exported by the client.
+
+    Parameters
+    ----------
+        path (str): Path of a csv, jsonl or parquet file, eg: the output of the filter or random commands.
+
+    Returns
+    -------
+        list_meals (list) : Meals dicts, or None if the file type is not supported.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    elif extension == '.jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    elif extension == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path).to_pylist()
+    else:
+        logging.error('Please insert a csv, jsonl or parquet file of meals.')
+        return
+
+
+class ThumbnailStore:
+    """
+    Stores images under the SHA-256 of their content, so the same image is never stored twice,
+    and appends each download to a JSON lines manifest mapping its url to its file.
+
+    Parameters
+    ----------
+        output_dir (str): Directory the images and the manifest are written to.
+
+    """
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.files = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(output_dir, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logging.warning(f'Skipping incomplete record of {self.manifest_path}.')
+                        continue
+                    self.files[entry['url']] = entry['file']
+
+    def has(self, url):
+        """
+        Returns
+        -------
+            has (bool) : Whether the image of the url was already downloaded and its file still exists.
+        """
+        file_name = self.files.get(url)
+        return file_name is not None and os.path.exists(os.path.join(self.output_dir, file_name))
+
+    def save(self, meal_id, url, content):
+        """
+        Writes an image, atomically, unless an image with the same content is already stored.
+
+        Parameters
+        ----------
+            meal_id (str): idMeal of the meal the image belongs to.
+
+            url (str): Url the image was downloaded from.
+
+            content (bytes): The image.
+
+        Returns
+        -------
+            file_name (str) : Name of the image file, eg: '<sha256>.jpg'.
+        """
+        extension = os.path.splitext(urlsplit(url).path)[1] or '.jpg'
+        file_name = hashlib.sha256(content).hexdigest() + extension
+        path = os.path.join(self.output_dir, file_name)
+        if not os.path.exists(path):
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self.files[url] = file_name
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'idMeal': meal_id, 'url': url, 'file': file_name, 'bytes': len(content)}) + '\n')
+
+        return file_name
\ No newline at end of file
@@ -0,0 +1,172 @@
+import csv
+import json
+import logging
+from itertools import islice
+
+"""Writers exporting meals records to files chunk by chunk, so large pulls are never fully held in memory."""
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class CSVWriter:
+    """
+    Appends meals records to a csv file straight from the JSON records, without pandas.
+    The file has the same layout as pandas.DataFrame.to_csv, including its running index column.
+
+    Parameters
+    ----------
+        path (str): Path of the csv file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.n_records = 0
+        self.columns = None
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file, lineterminator='\n')
+
+    def write(self, records):
+        if self.columns is None:
+            self.columns = list(records[0])
+            self._writer.writerow([''] + self.columns)
+        self._writer.writerows([index] + [record.get(column) for column in self.columns]
+                               for index, record in enumerate(records, self.n_records))
+        self.n_records += len(records)
+
+    def close(self):
+        self._file.close()
+
+
+class JSONLWriter:
+    """
+    Appends meals records to a JSON lines file, one record per line.
+
+    Parameters
+    ----------
+        path (str): Path of the JSON lines file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.n_records = 0
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, records):
+        self._file.writelines(json.dumps(record) + '\n' for record in records)
+        self.n_records += len(records)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Appends meals records to a parquet file, one row group per chunk. Requires pyarrow.
+    Every column is stored as a nullable string, as returned by the API.
+
+    Parameters
+    ----------
+        path (str): Path of the parquet file.
+    """
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('Writing parquet files requires pyarrow: pip install pyarrow.')
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self.n_records = 0
+        self._schema = None
+        self._writer = None
+
+    def write(self, records):
+        if self._writer is None:
+            self._schema = self._pa.schema([(column, self._pa.string()) for column in records[0]])
+            self._writer = self._pq.ParquetWriter(self.path, self._schema)
+
+        columns = {name: [record.get(name) for record in records] for name in self._schema.names}
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+        self.n_records += len(records)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+OUTPUT_WRITERS = {
+    'csv': CSVWriter,
+    'jsonl': JSONLWriter,
+    'parquet': ParquetWriter
+}
+
+
+def write_records(records, output_type, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Writes meals records to a file in chunks, as they are consumed from the records iterable.
+
+    Parameters
+    ----------
+        records (iterable): Meals dicts, eg: a generator yielding the meals as the API responds.
+
+        output_type (str): Format of the file: csv, jsonl or parquet.
+
+        path (str): Path of the file the records are written to.
+
+        chunk_size (int): Number of records held in memory before being written, default 500.
+
+    Returns
+    -------
+        n_records (int) : Number of records written.
+    """
+    writer = OUTPUT_WRITERS[output_type](path)
+    try:
+        records = iter(records)
+        chunk = list(islice(records, chunk_size))
+        while chunk:
+            writer.write(chunk)
+            chunk = list(islice(records, chunk_size))
+    finally:
+        writer.close()
+
+    if writer.n_records == 0:
+        logging.warning(f'No records were written to {path}.')
+
+    return writer.n_records
+
+
+def export_records(records, output_type, output_path=None):
+    """
+    Returns data according to output type.
+
+    Parameters
+    ----------
+        records (iterable): Meals dicts returned by the API.
+
+        output_type (str) : Format of the data outuput: pandas (pandas.DataFrame), normalized (tuple of pandas.DataFrame
+                            with the meals and their ingredients in long format, see recipes.normalize_meals), csv, jsonl or parquet.
+
+        output_path (str) : Absolute path of where the file should be written to, default './output.{output_type}'.
+
+    Returns
+    -------
+        pandas.DataFrame, (pandas.DataFrame, pandas.DataFrame) when normalized, or None when the data is exported to a file
+    """
+    if output_type == 'pandas':
+        import pandas as pd
+        logging.info(f'Pulling data as a pandas.DataFrame.')
+        return pd.DataFrame(list(records))
+    elif output_type == 'normalized':
+        import pandas as pd
+        from api_client import recipes
+        logging.info(f'Pulling data as normalized meals and ingredients pandas.DataFrame.')
+        return recipes.normalize_meals(pd.DataFrame(list(records)))
+    elif output_type in OUTPUT_WRITERS:
+        output_path = output_path or f'./output.{output_type}'
+        logging.info(f'Exporting data as {output_type} to {output_path}.')
+        n_records = write_records(records, output_type, output_path)
+        logging.info(f'Exported {n_records} meals to {output_path}.')
+        return
+    else:
+        logging.error(f'Please specify a valid output type: pandas, normalized, csv, jsonl or parquet.')
+        return
\ No newline at end of file
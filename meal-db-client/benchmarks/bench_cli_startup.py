@@ -0,0 +1,68 @@
+"""
+Benchmark of the CLI startup time: cron wrappers start it hundreds of times, so importing it must stay cheap.
+
+Imports api_client.cli in fresh interpreters and reports the min, median and max seconds as JSON,
+failing when the median is above the budget:
+
+    python benchmarks/bench_cli_startup.py --runs 10 --budget 0.5 --output startup.json
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_startup():
+    """
+    Returns
+    -------
+        seconds (float) : Seconds a fresh interpreter takes to import api_client.cli.
+    """
+    code = "import time; started_at = time.perf_counter(); import api_client.cli; print(time.perf_counter() - started_at)"
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT_DIR, universal_newlines=True)
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the CLI startup time.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreters importing the CLI.')
+    parser.add_argument('--budget', type=float, default=0.5, help='Seconds the median import may take.')
+    parser.add_argument('--output', default=None, help='JSON file the results are written to, default stdout.')
+    args = parser.parse_args()
+
+    seconds = [measure_startup() for _ in range(args.runs)]
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+            'budget': args.budget
+        },
+        'results': {
+            'min_seconds': round(min(seconds), 4),
+            'median_seconds': round(statistics.median(seconds), 4),
+            'max_seconds': round(max(seconds), 4)
+        }
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if report['results']['median_seconds'] > args.budget:
+        logging.warning(f"The CLI takes {report['results']['median_seconds']}s to import, above the {args.budget}s budget.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Offline benchmarks of the MealDBClient against a local stand-in of The Meal DB API.
+
+Measures requests/sec, p50/p99 request latency and peak Python memory of get_meals_filter_by,
+get_meals_search_by, get_meals_random(n) and of writing the output files, at several sizes.
+Results are printed, or written with --output, as JSON so runs can be compared:
+
+    python benchmarks/bench_meal_db.py --sizes 10 100 1000 --workers 8 --latency 0.005 --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_client import meal_db, writers
+from api_client.tests.fake_server import FakeMealDBServer, CATEGORIES, make_meals
+
+
+def measure(name, size, run, new_client=None):
+    """
+    Runs a benchmark twice: an untraced pass timing it, and a pass tracing its peak memory,
+    so the tracing overhead doesn't slow down the measured throughput.
+
+    Parameters
+    ----------
+        run (callable): The benchmark, called with the client of each pass, eg: lambda client: client.get_meals_random(10).
+
+        new_client (callable): Creates the client of each pass, whose request stats give the requests and latencies,
+                               default None (the benchmark is called with None).
+
+    Returns
+    -------
+        result (dict) : Duration, throughput, latency percentiles in ms and peak memory in MB of the run.
+    """
+    client = new_client() if new_client is not None else None
+    started_at = time.perf_counter()
+    run(client)
+    seconds = time.perf_counter() - started_at
+
+    traced_client = new_client() if new_client is not None else None
+    tracemalloc.start()
+    run(traced_client)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = client.stats.summary() if client is not None else {'requests': 0, 'latency_ms': {}}
+    n_requests = stats['requests']
+    result = {
+        'benchmark': name,
+        'size': size,
+        'seconds': round(seconds, 4),
+        'requests': n_requests,
+        'requests_per_sec': round(n_requests / seconds, 2) if n_requests else None,
+        'records_per_sec': round(size / seconds, 2),
+        'latency_p50_ms': stats['latency_ms'].get('p50'),
+        'latency_p99_ms': stats['latency_ms'].get('p99'),
+        'peak_memory_mb': round(peak_memory / 2 ** 20, 3)
+    }
+    requests_summary = f", {result['requests_per_sec']} requests/s, p99 {result['latency_p99_ms']}ms" if n_requests else ''
+    logging.warning(f"{name} (size {size}): {result['seconds']}s, {result['records_per_sec']} records/s"
+                    f"{requests_summary}, {result['peak_memory_mb']}MB peak memory.")
+    return result
+
+
+def run_benchmarks(sizes, workers, latency, output_types):
+    """
+    Runs every benchmark at every size against a fake API serving max(sizes) meals.
+    The fake API runs in this process, so its allocations are included in the peak memory.
+
+    Returns
+    -------
+        results (list) : One result dict per benchmark and size.
+    """
+    meals = make_meals(max(sizes))
+    results = []
+    with FakeMealDBServer(meals, latency=latency) as server, tempfile.TemporaryDirectory() as tmp_dir:
+        def new_client():
+            return meal_db.MealDBClient(key='1', api_base_url=server.api_base_url, pool_size=max(workers, 10))
+
+        for size in sizes:
+            results.append(measure('get_meals_filter_by', size, lambda client: [
+                client.get_meals_filter_by(filter_type='category', filter_value=CATEGORIES[i % len(CATEGORIES)])
+                for i in range(size)], new_client))
+
+            results.append(measure('get_meals_search_by', size, lambda client: [
+                client.get_meals_search_by(search_type='meal_id', search_value=meal['idMeal'])
+                for meal in meals[:size]], new_client))
+
+            results.append(measure('get_meals_random', size, lambda client: client.get_meals_random(n_meals=size), new_client))
+
+            results.append(measure(f'get_meals_random_workers_{workers}', size,
+                                   lambda client: client.get_meals_random(n_meals=size, workers=workers), new_client))
+
+            for output_type in output_types:
+                output_path = os.path.join(tmp_dir, f'output.{output_type}')
+                results.append(measure(f'write_{output_type}', size,
+                                       lambda client: writers.write_records(iter(meals[:size]), output_type, output_path)))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks of the MealDBClient.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Number of meals or calls per benchmark.')
+    parser.add_argument('--workers', type=int, default=8, help='Workers of the concurrent random benchmark.')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds the fake API delays each response.')
+    parser.add_argument('--output_types', nargs='+', default=['csv', 'jsonl', 'parquet'], help='Output files to benchmark.')
+    parser.add_argument('--output', default=None, help='JSON file the results are written to, default stdout.')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    output_types = [t for t in args.output_types if t != 'parquet' or _has_pyarrow()]
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'workers': args.workers,
+            'latency': args.latency
+        },
+        'results': run_benchmarks(args.sizes, args.workers, args.latency, output_types)
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        logging.warning('pyarrow is not installed, skipping the parquet benchmark.')
+        return False
+
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,10 @@ setuptools.setup(
         'requests==2.23.0',
         'responses==0.10.14'
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'parquet': ['pyarrow'],
+        'yaml': ['pyyaml']
+    },
     scripts=['meal_db_client.py']
 )
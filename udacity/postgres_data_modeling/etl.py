@@ -1,37 +1,89 @@
 import os
+import io
+import json
 import glob
+import hashlib
+import argparse
+import multiprocessing
+from functools import partial
 import psycopg2
+from psycopg2.extras import execute_values
 import pandas as pd
 from sql_queries import *
 
 
-def process_song_file(cur, filepath):
+def parse_song_file(filepath):
     """
-    Processes and inserts records into songs and artists dimension tables. 
-    
-        filepath (str): high level directory containing song JSON files
+    Reads the song and artist records of a song file.
+
+        filepath (str): path of a song JSON file
+
+    Returns the song record and the artist record, as tuples of column values.
     """
-    
-    # open song file
-    df = pd.DataFrame([pd.read_json(filepath, typ='series')])
+
+    # open song file, a single small JSON object: decoded without pandas
+    with open(filepath, 'r', encoding='utf-8') as f:
+        song = json.load(f)
+
+    song_data = (song['song_id'], song['title'], song['artist_id'], song['year'], song['duration'])
+    artist_data = (song['artist_id'], song['artist_name'], song['artist_location'], song['artist_latitude'], song['artist_longitude'])
+
+    return song_data, artist_data
+
+
+def parse_song_files(filepaths):
+    """
+    Reads the song and artist records of a batch of song files.
+
+        filepaths (list): paths of song JSON files
+
+    Returns the songs and artists records of all the files, as lists of tuples.
+    """
+    records = [parse_song_file(filepath) for filepath in filepaths]
+    return [song_data for song_data, _ in records], [artist_data for _, artist_data in records]
+
+
+def insert_song_records(cur, records):
+    """
+    Inserts the song and artist records of a song file, parsed with parse_song_file.
+    """
+    song_data, artist_data = records
 
     # insert song record
-    song_data = list(df[['song_id', 'title', 'artist_id', 'year', 'duration']].values[0])
     cur.execute(song_table_insert, song_data)
     
     # insert artist record
-    artist_data = list(df[['artist_id', 'artist_name', 'artist_location', 'artist_latitude', 'artist_longitude']].values[0])
     cur.execute(artist_table_insert, artist_data)
 
 
-def process_log_file(cur, filepath):
+def insert_song_batch(cur, records, page_size=1000):
     """
-    Processes and inserts records into users and time dimension tables. 
-    Gets data from songs and artists dimensions table to insert data into songplays fact table.
-        
-        filepath (str): high level directory containing log JSON files
+    Inserts the songs and artists records of a batch of song files, parsed with parse_song_files,
+    with multi-row INSERT statements of up to page_size rows.
     """
+    songs, artists = records
+    execute_values(cur, song_table_batch_insert, songs, page_size=page_size)
+    execute_values(cur, artist_table_batch_insert, artists, page_size=page_size)
+
+
+def process_song_file(cur, filepath):
+    """
+    Processes and inserts records into songs and artists dimension tables. 
     
+        filepath (str): high level directory containing song JSON files
+    """
+    insert_song_records(cur, parse_song_file(filepath))
+
+
+def parse_log_file(filepath):
+    """
+    Reads the NextSong events of a log file and builds their time records.
+
+        filepath (str): path of a log JSON file
+
+    Returns the events, with ts converted to datetime, and the time records of their distinct timestamps.
+    """
+
     # open log file
     df = pd.read_json(filepath, lines=True)
 
@@ -42,43 +94,208 @@ def process_log_file(cur, filepath):
     t = pd.to_datetime(df.ts, unit='ms')
     df['ts'] = t
     
-    # insert time data records
+    # time data records
     time_data = [t, t.dt.hour, t.dt.day, t.dt.weekofyear, t.dt.month, t.dt.year, t.dt.weekday]
     column_labels = ['start_time', 'hour', 'day', 'week', 'month', 'year', 'weekday']
     d = dict(zip(column_labels, time_data))
-    time_df = pd.DataFrame(d)
+    time_df = pd.DataFrame(d).drop_duplicates(subset='start_time')
+
+    return df, time_df
+
+
+def latest_users(df):
+    """
+    Builds the users records of the log events, one per user with the level of their latest event by ts.
+    Events with the same ts keep their order in the file.
+    """
+    user_df = df[['ts', 'userId', 'firstName', 'lastName', 'gender', 'level']]
+    user_df = user_df.sort_values('ts', kind='mergesort').drop_duplicates(subset='userId', keep='last')
+    return user_df[['userId', 'firstName', 'lastName', 'gender', 'level']]
+
+
+def load_song_lookup(cur):
+    """
+    Loads the (title, artist name, duration) -> (song_id, artist_id) lookup of every song, to match the log events
+    with one query per run instead of one query per event. The first match of a key wins.
+    """
+    cur.execute(song_lookup_select)
+    song_lookup = pd.DataFrame(cur.fetchall(), columns=['title', 'name', 'duration', 'song_id', 'artist_id'])
+    return song_lookup.drop_duplicates(subset=['title', 'name', 'duration'])
+
+
+def match_songs(df, song_lookup):
+    """
+    Matches the log events to their song and artist with a hash join on (song, artist, length).
+
+    Returns the song_id and artist_id of each event, in the events order, None when the song is not in the database.
+    """
+    matches = df[['song', 'artist', 'length']].merge(song_lookup, how='left', sort=False,
+                                                      left_on=['song', 'artist', 'length'],
+                                                      right_on=['title', 'name', 'duration'])
+    matches = matches[['song_id', 'artist_id']].astype(object)
+    return matches.where(matches.notnull(), None)
+
+
+def copy_df(cur, df, table):
+    """
+    Streams a DataFrame into a table with a single COPY FROM STDIN, its columns matching the table columns by name.
+    Missing values are loaded as NULL.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cur.copy_expert('COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(table, ', '.join(df.columns)), buffer)
+
+
+def insert_log_records(cur, records, song_lookup):
+    """
+    Inserts the time, users and songplays records of a log file, parsed with parse_log_file, row by row.
 
+        song_lookup (pandas.DataFrame): songs loaded with load_song_lookup
+    """
+    df, time_df = records
+
+    # insert time data records
     for i, row in time_df.iterrows():
         cur.execute(time_table_insert, list(row))
 
-    # load user table
-    user_df = df[['userId', 'firstName', 'lastName', 'gender', 'level']]
+    # load user table, one record per user
+    user_df = latest_users(df)
 
     # insert user records
     for i, row in user_df.iterrows():
         cur.execute(user_table_insert, row)
 
+    # get songid and artistid from song and artist tables
+    songs = match_songs(df, song_lookup)
+
     # insert songplay records
-    for index, row in df.iterrows():
-        
-        # get songid and artistid from song and artist tables
-        cur.execute(song_select, (row.song, row.artist, row.length))
-        results = cur.fetchone()
-        
-        if results:
-            songid, artistid = results
-        else:
-            songid, artistid = None, None
+    for row, songid, artistid in zip(df.itertuples(), songs.song_id, songs.artist_id):
 
         # insert songplay record
         songplay_data = [row.ts, row.userId, row.level, songid, artistid, row.sessionId, row.location, row.userAgent]
         cur.execute(songplay_table_insert, songplay_data)
 
 
-def process_data(cur, conn, filepath, func):
+def process_log_file(cur, filepath, song_lookup=None):
+    """
+    Processes and inserts records into users and time dimension tables. 
+    Gets data from songs and artists dimensions table to insert data into songplays fact table.
+        
+        filepath (str): high level directory containing log JSON files
+
+        song_lookup (pandas.DataFrame): songs loaded with load_song_lookup, loaded for this file when None
+    """
+    if song_lookup is None:
+        song_lookup = load_song_lookup(cur)
+    insert_log_records(cur, parse_log_file(filepath), song_lookup)
+
+
+def bulk_insert_log_records(cur, records, song_lookup):
+    """
+    Same records as insert_log_records, in a few round trips per file instead of a few per event:
+    the time, users and songplays rows are COPYed into temporary staging tables, then moved into
+    the Sparkify tables with one INSERT ... SELECT per table, keeping the ON CONFLICT rules of the single row inserts.
+
+        song_lookup (pandas.DataFrame): songs loaded with load_song_lookup
+    """
+    df, time_df = records
+    songs = match_songs(df, song_lookup)
+    position = range(len(df))
+
+    # stage the records, the staging tables are emptied when the file is committed
+    for query in staging_table_create_queries:
+        cur.execute(query)
+
+    copy_df(cur, time_df, 'time_staging')
+
+    users = latest_users(df)
+    user_df = pd.DataFrame({'position': range(len(users)), 'user_id': users.userId.values, 'first_name': users.firstName.values,
+                            'last_name': users.lastName.values, 'gender': users.gender.values, 'level': users.level.values})
+    copy_df(cur, user_df, 'users_staging')
+
+    songplay_df = pd.DataFrame({'position': position, 'start_time': df.ts.values, 'user_id': df.userId.values,
+                                'level': df.level.values, 'song_id': songs.song_id.values, 'artist_id': songs.artist_id.values,
+                                'session_id': df.sessionId.values,
+                                'location': df.location.values, 'user_agent': df.userAgent.values})
+    copy_df(cur, songplay_df, 'songplays_staging')
+
+    # insert the staged records
+    cur.execute(time_table_bulk_insert)
+    cur.execute(user_table_bulk_insert)
+    cur.execute(songplay_table_bulk_insert)
+
+
+def process_log_file_bulk(cur, filepath, song_lookup=None):
+    """
+    Same as process_log_file, loading the file with bulk_insert_log_records.
+
+        filepath (str): path of a log JSON file
+
+        song_lookup (pandas.DataFrame): songs loaded with load_song_lookup, loaded for this file when None
+    """
+    if song_lookup is None:
+        song_lookup = load_song_lookup(cur)
+    bulk_insert_log_records(cur, parse_log_file(filepath), song_lookup)
+
+
+def file_fingerprint(filepath):
+    """
+    Returns the size, modification time and SHA-1 of the content of a file.
+    """
+    stat = os.stat(filepath)
+    with open(filepath, 'rb') as f:
+        file_hash = hashlib.sha1(f.read()).hexdigest()
+    return stat.st_size, stat.st_mtime, file_hash
+
+
+def find_unprocessed_files(cur, all_files):
+    """
+    Compares the files with the processed_files manifest and returns the files to load with their fingerprint.
+    Files with the same size and mtime as when they were loaded are skipped without being read,
+    files touched since but with the same content are skipped and their new mtime is recorded, in one statement.
+
+    A changed log file is loaded again as a whole: its songplays are inserted a second time, next to the ones
+    of its previous version, as songplays have no key to match them on.
+    """
+    cur.execute(processed_file_select)
+    processed_files = {path: (size, mtime, file_hash) for path, size, mtime, file_hash in cur.fetchall()}
+
+    unprocessed_files = []
+    touched_files = []
+    for datafile in all_files:
+        previous = processed_files.get(datafile)
+        stat = os.stat(datafile)
+        if previous and previous[:2] == (stat.st_size, stat.st_mtime):
+            continue
+
+        fingerprint = file_fingerprint(datafile)
+        if previous and previous[2] == fingerprint[2]:
+            touched_files.append((datafile, *fingerprint))
+            continue
+        unprocessed_files.append((datafile, fingerprint))
+
+    if touched_files:
+        execute_values(cur, processed_file_table_batch_insert, touched_files)
+
+    return unprocessed_files
+
+
+def process_data(cur, conn, filepath, func, parse=None, workers=1, use_manifest=False, reload=False, batch_size=None):
     """
     Takes in a directory and a function and executes the function with all .json files inside the input directory.
+
+    When a parse function is given, func(cur, records) inserts the records returned by parse(filepath).
+    With workers > 1, the files are parsed by a pool of worker processes while the main process
+    inserts and commits them one by one, in the order of the files.
+
+    With a batch_size, parse receives lists of up to batch_size paths, and each batch is inserted and committed at once.
+
+    With use_manifest, each file is recorded in the processed_files manifest in the same transaction as its rows,
+    and the files already loaded and unchanged since are skipped, unless reload is set.
     """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError('batch_size must be at least 1, got {}.'.format(batch_size))
     
     # get all files matching extension from directory
     all_files = []
@@ -91,19 +308,89 @@ def process_data(cur, conn, filepath, func):
     num_files = len(all_files)
     print('{} files found in {}'.format(num_files, filepath))
 
-    # iterate over files and process
-    for i, datafile in enumerate(all_files, 1):
-        func(cur, datafile)
+    # skip the files already loaded
+    fingerprints = None
+    if use_manifest and reload:
+        cur.execute(processed_file_table_create)
+        conn.commit()
+        fingerprints = {datafile: file_fingerprint(datafile) for datafile in all_files}
+    elif use_manifest:
+        cur.execute(processed_file_table_create)
+        unprocessed_files = find_unprocessed_files(cur, all_files)
         conn.commit()
-        print('{}/{} files processed.'.format(i, num_files))
+        print('{} files already loaded and unchanged, skipped.'.format(num_files - len(unprocessed_files)))
+        all_files = [datafile for datafile, _ in unprocessed_files]
+        fingerprints = dict(unprocessed_files)
+        num_files = len(all_files)
+
+    # group the files in batches parsed, inserted and committed together
+    if batch_size is not None:
+        batches = [all_files[i:i + batch_size] for i in range(0, num_files, batch_size)]
+        items = batches
+    else:
+        batches = [[datafile] for datafile in all_files]
+        items = all_files
+
+    # parse the files in the worker processes, in order
+    pool = None
+    if parse is None:
+        parsed_items = items
+    elif workers > 1:
+        pool = multiprocessing.Pool(workers)
+        parsed_items = pool.imap(parse, items, chunksize=max(1, min(64, len(items) // (workers * 4))))
+    else:
+        parsed_items = map(parse, items)
+
+    # iterate over files and process
+    try:
+        num_processed = 0
+        for batch, records in zip(batches, parsed_items):
+            func(cur, records)
+            if fingerprints is not None:
+                execute_values(cur, processed_file_table_batch_insert, [(datafile, *fingerprints[datafile]) for datafile in batch])
+            conn.commit()
+            num_processed += len(batch)
+            print('{}/{} files processed.'.format(num_processed, num_files))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def positive_int(value):
+    """
+    Parses a command line value that must be an integer of at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('must be at least 1, got {}'.format(value))
+    return number
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Loads the song and log JSON files into the Sparkify database.')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Load each log file with COPY into staging tables instead of inserting it row by row.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes parsing the JSON files, the main process inserts them in order.')
+    parser.add_argument('--song_batch_size', type=positive_int, default=1000,
+                        help='Number of song files parsed, inserted and committed together.')
+    parser.add_argument('--reload', action='store_true',
+                        help='Load every file again and update their manifest records, instead of skipping the files loaded '
+                             'by a previous run and unchanged since. The songplays of the log files are inserted again.')
+    args = parser.parse_args()
+
     conn = psycopg2.connect("host=127.0.0.1 dbname=sparkifydb user=student password=student")
     cur = conn.cursor()
 
-    process_data(cur, conn, filepath='data/song_data', func=process_song_file)
-    process_data(cur, conn, filepath='data/log_data', func=process_log_file)
+    process_data(cur, conn, filepath='data/song_data', func=insert_song_batch, parse=parse_song_files,
+                 workers=args.workers, use_manifest=True, reload=args.reload, batch_size=args.song_batch_size)
+
+    # every song is loaded, match the log events against them in memory
+    song_lookup = load_song_lookup(cur)
+    insert_func = bulk_insert_log_records if args.bulk else insert_log_records
+    process_data(cur, conn, filepath='data/log_data', func=partial(insert_func, song_lookup=song_lookup),
+                 parse=parse_log_file, workers=args.workers, use_manifest=True, reload=args.reload)
 
     conn.close()
 
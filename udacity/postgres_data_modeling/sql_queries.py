@@ -5,6 +5,7 @@ user_table_drop = "DROP TABLE IF EXISTS users;"
 song_table_drop = "DROP TABLE IF EXISTS songs;"
 artist_table_drop = "DROP TABLE IF EXISTS artists;"
 time_table_drop = "DROP TABLE IF EXISTS time;"
+processed_file_table_drop = "DROP TABLE IF EXISTS processed_files;"
 
 # CREATE TABLES
 
@@ -64,6 +65,16 @@ CREATE TABLE IF NOT EXISTS time (
     );
 """)
 
+processed_file_table_create = ("""
+CREATE TABLE IF NOT EXISTS processed_files (
+    path varchar PRIMARY KEY,
+    size bigint,
+    mtime double precision,
+    hash varchar,
+    loaded_at timestamp DEFAULT now()
+    );
+""")
+
 # INSERT RECORDS
 
 songplay_table_insert = ("""
@@ -96,18 +107,102 @@ VALUES (%s, %s, %s, %s, %s, %s, %s)
 ON CONFLICT (start_time) DO NOTHING;
 """)
 
-# FIND SONGS
+# STAGING TABLES
+# Temporary tables the bulk loader COPYs a log file into, emptied when the file's transaction commits.
+# position keeps the order of the events in the file.
+
+time_staging_create = ("""
+CREATE TEMP TABLE IF NOT EXISTS time_staging (LIKE time) ON COMMIT DELETE ROWS;
+""")
+
+user_staging_create = ("""
+CREATE TEMP TABLE IF NOT EXISTS users_staging (
+    position int,
+    user_id int,
+    first_name varchar,
+    last_name varchar,
+    gender varchar,
+    level varchar
+    ) ON COMMIT DELETE ROWS;
+""")
+
+songplay_staging_create = ("""
+CREATE TEMP TABLE IF NOT EXISTS songplays_staging (
+    position int,
+    start_time timestamp,
+    user_id varchar,
+    level varchar,
+    song_id varchar,
+    artist_id varchar,
+    session_id int,
+    location varchar,
+    user_agent varchar
+    ) ON COMMIT DELETE ROWS;
+""")
+
+# BULK INSERT RECORDS
+# Same conflict rules as the single row inserts, applied to the whole staging table at once.
+
+time_table_bulk_insert = ("""
+INSERT INTO time (start_time, hour, day, week, month, year, weekday)
+SELECT start_time, hour, day, week, month, year, weekday
+FROM time_staging
+ON CONFLICT (start_time) DO NOTHING;
+""")
+
+# A user can only be updated once per statement, the last event of the file sets its level.
+user_table_bulk_insert = ("""
+INSERT INTO users (user_id, first_name, last_name, gender, level)
+SELECT DISTINCT ON (user_id) user_id, first_name, last_name, gender, level
+FROM users_staging
+ORDER BY user_id, position DESC
+ON CONFLICT (user_id) DO UPDATE SET level=EXCLUDED.level;
+""")
+
+songplay_table_bulk_insert = ("""
+INSERT INTO songplays (start_time, user_id, level, song_id, artist_id, session_id, location, user_agent)
+SELECT start_time, user_id, level, song_id, artist_id, session_id, location, user_agent
+FROM songplays_staging
+ORDER BY position;
+""")
+
+# BATCH INSERT RECORDS
+# Multi-row inserts for psycopg2.extras.execute_values, which expands VALUES %s into a page of rows.
 
-song_select = ("""
-SELECT song_id, artist_id FROM 
+song_table_batch_insert = ("""
+INSERT INTO songs (song_id, title, artist_id, year, duration)
+VALUES %s
+ON CONFLICT (song_id) DO NOTHING;
+""")
+
+artist_table_batch_insert = ("""
+INSERT INTO artists (artist_id, name, location, latitude, longitude)
+VALUES %s
+ON CONFLICT (artist_id) DO NOTHING;
+""")
+
+processed_file_table_batch_insert = ("""
+INSERT INTO processed_files (path, size, mtime, hash)
+VALUES %s
+ON CONFLICT (path) DO UPDATE SET size=EXCLUDED.size, mtime=EXCLUDED.mtime, hash=EXCLUDED.hash, loaded_at=now();
+""")
+
+# FIND PROCESSED FILES
+
+processed_file_select = ("""
+SELECT path, size, mtime, hash FROM processed_files
+""")
+
+# FIND SONGS
+# Every song and artist, to match the log events in memory.
+song_lookup_select = ("""
+SELECT title, name, duration, song_id, artist_id FROM 
 songs JOIN artists USING (artist_id)
-WHERE title = %s
-AND name = %s
-AND duration = %s
 """)
 
 
 # QUERY LISTS
 
-create_table_queries = [songplay_table_create, user_table_create, song_table_create, artist_table_create, time_table_create]
-drop_table_queries = [songplay_table_drop, user_table_drop, song_table_drop, artist_table_drop, time_table_drop]
\ No newline at end of file
+create_table_queries = [songplay_table_create, user_table_create, song_table_create, artist_table_create, time_table_create, processed_file_table_create]
+drop_table_queries = [songplay_table_drop, user_table_drop, song_table_drop, artist_table_drop, time_table_drop, processed_file_table_drop]
+staging_table_create_queries = [time_staging_create, user_staging_create, songplay_staging_create]
\ No newline at end of file